@@ -0,0 +1,72 @@
+"""
+    Import time of tkintercanvaswidgets.
+
+    Usage:
+        python benchmarks/import_time.py [-n N] [--max-ms MS]
+
+    The package is imported (and CanvasSection resolved) in fresh
+    interpreters with python -X importtime. The best cumulative time of the
+    package is reported, and the run fails when one of the modules only
+    needed by image code (PIL, concurrent.futures) or one of the avoided
+    standard modules got imported, or when the time exceeds --max-ms.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = 'tkintercanvaswidgets'
+FORBIDDEN = ('PIL', 'concurrent.futures', 'typing', 'threading')
+CODE = f'import {PACKAGE}; {PACKAGE}.CanvasSection'
+
+
+def import_times():
+    """
+        Import the package in a new interpreter.
+    :return: Dictionary of the cumulative import time (in µs) per module
+             and the total time of the imports made by the executed code.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', CODE],
+                            cwd=ROOT, capture_output=True, text=True,
+                            check=True)
+    times = {}
+    total = None
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.rstrip()
+        times[name.strip()] = int(cumulative)
+        # Modules of the interpreter startup come before the package.
+        if name.strip() == PACKAGE:
+            total = 0
+        if total is not None and not name[1:].startswith(' '):
+            total += int(cumulative)
+    return times, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('-n', type=int, default=5,
+                        help='Amount of interpreters to start.')
+    parser.add_argument('--max-ms', type=float,
+                        help='Fail when the import takes longer.')
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.n)]
+    # The package line only covers `import`, the modules loaded by the
+    # attribute access are top-level lines of their own.
+    best = min(total for _, total in runs)
+    print(f'{PACKAGE} import: {best / 1000:.1f} ms')
+    loaded = [name for name in FORBIDDEN
+              if any(module == name or module.startswith(f'{name}.')
+                     for module in runs[0][0])]
+    if loaded:
+        sys.exit(f'Imported eagerly: {", ".join(loaded)}')
+    if args.max_ms is not None and best / 1000 > args.max_ms:
+        sys.exit(f'Import takes longer than {args.max_ms} ms.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+    Python-side memory used per widget by tkintercanvaswidgets.
+
+    Usage:
+        python benchmarks/measure_memory.py [-n N] [--output memory.json]
+                                            [--compare previous.json]
+
+    Only the Python allocations are traced (with tracemalloc), the canvas
+    items themselves live in Tk. Run it on two commits and pass the results
+    of the first one with --compare to see the difference.
+"""
+import argparse
+import gc
+import json
+import sys
+import tkinter
+import tracemalloc
+
+from run_benchmarks import ROOT, _ensure_display, _git_commit
+
+sys.path.insert(0, ROOT)
+
+from tkintercanvaswidgets import (CanvasSection, CanvasButton,  # noqa: E402
+                                  SimpleCanvasCheckbox)
+
+WIDGETS = {
+    'section': lambda parent, i: CanvasSection(parent, i % 100, i // 100,
+                                               10, 10),
+    'text_button': lambda parent, i: CanvasButton(
+        parent, i % 100, i // 100, text={'text': 'button'}),
+    'image_button': lambda parent, i: CanvasButton(
+        parent, i % 100, i // 100, image={'image': IMAGE},
+        text={'text': 'button'}, cursored_img=IMAGE),
+    'checkbox': lambda parent, i: SimpleCanvasCheckbox(
+        parent, i % 50 * 20, i // 50 * 20, 100, 18, extra_txt='box'),
+}
+IMAGE = None
+
+
+def measure(canvas, build, n):
+    parent = CanvasSection(canvas, 0, 0, 1000, 1000)
+    # Build one widget first, so shared caches do not count.
+    keep = [build(parent, 0)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep.extend(build(parent, i) for i in range(1, n + 1))
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    used = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return used / n
+
+
+def main():
+    global IMAGE
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('-n', type=int, default=5000,
+                        help='Amount of widgets of every kind to create.')
+    parser.add_argument('--output', help='Path of the JSON results file.')
+    parser.add_argument('--compare', help='Previous JSON results to compare.')
+    args = parser.parse_args()
+
+    _ensure_display()
+    root = tkinter.Tk()
+    IMAGE = tkinter.PhotoImage(width=16, height=16)
+    results = {}
+    for name, build in WIDGETS.items():
+        canvas = tkinter.Canvas(root, width=1000, height=1000)
+        results[name] = measure(canvas, build, args.n)
+        canvas.destroy()
+    root.destroy()
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)['bytes_per_widget']
+    print(f'{"widget":<16}{"bytes":>10}{"before":>10}')
+    for name, size in results.items():
+        before = previous.get(name)
+        print(f'{name:<16}{size:>10.0f}'
+              f'{"" if before is None else f"{before:.0f}":>10}')
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'commit': _git_commit(), 'n': args.n,
+                       'bytes_per_widget': results}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
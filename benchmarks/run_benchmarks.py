@@ -0,0 +1,301 @@
+"""
+    Headless benchmarks of tkintercanvaswidgets.
+
+    Usage:
+        python benchmarks/run_benchmarks.py [-n N] [--output results.json]
+                                            [--compare previous.json]
+                                            [--only name ...]
+
+    On Linux without a DISPLAY an Xvfb server is started for the run.
+    Every benchmark runs in its own process and reports its throughput,
+    the peak RSS of that process and the amount of Tcl (and font) calls
+    made. The calls are counted in a second run, so the time is measured
+    without the counting overhead. The results are stored as JSON so runs
+    of different commits can be compared with --compare.
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+import tkinter
+from tkinter.font import Font
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tkintercanvaswidgets import (CanvasSection, CanvasButton,  # noqa: E402
+                                  SimpleCanvasCheckbox, image_cache)
+from tkintercanvaswidgets._helpers import (_fit_font_height,  # noqa: E402
+                                           _fit_text_width, _get_image,
+                                           _font_size_table, _measurers)
+
+ICON = os.path.join(ROOT, 'btn_icon.png')
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _ensure_display():
+    if os.environ.get('DISPLAY') or not sys.platform.startswith('linux'):
+        return
+    xvfb = shutil.which('Xvfb')
+    if xvfb is None:
+        sys.exit('No DISPLAY is set and Xvfb was not found.')
+    display = f':{os.getpid() % 1000 + 100}'
+    server = subprocess.Popen([xvfb, display, '-screen', '0', '1280x1024x24',
+                               '-nolisten', 'tcp'],
+                              stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL)
+    atexit.register(server.terminate)
+    os.environ['DISPLAY'] = display
+    for _ in range(50):
+        try:
+            tkinter.Tk().destroy()
+            return
+        except tkinter.TclError:
+            time.sleep(0.1)
+    sys.exit('Xvfb did not start.')
+
+
+def _peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class CountingFont(Font):
+    """
+        Font that counts its measure, metrics and config calls.
+    """
+    calls = 0
+
+    def measure(self, *args, **kwargs):
+        CountingFont.calls += 1
+        return super().measure(*args, **kwargs)
+
+    def metrics(self, *args, **kwargs):
+        CountingFont.calls += 1
+        return super().metrics(*args, **kwargs)
+
+    def config(self, *args, **kwargs):
+        CountingFont.calls += 1
+        return super().config(*args, **kwargs)
+
+    configure = config
+
+
+class CountingTk:
+    """
+        Tcl interpreter wrapper that counts the commands sent to Tcl,
+        a batched script counts as one.
+    """
+
+    def __init__(self, tk):
+        self._tk = tk
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._tk.call(*args)
+
+    def eval(self, script):
+        self.calls += 1
+        return self._tk.eval(script)
+
+    def __getattr__(self, name):
+        return getattr(self._tk, name)
+
+
+@benchmark
+def nested_sections(canvas, n):
+    section = CanvasSection(canvas, 0, 0, 1000, 1000)
+    for _ in range(n):
+        section = CanvasSection(section, 1, 1, 10, 10)
+        section.create_rectangle(0, 0, 5, 5)
+
+
+@benchmark
+def text_buttons(canvas, n):
+    section = CanvasSection(canvas, 0, 0, 1000, 1000)
+    for i in range(n):
+        CanvasButton(section, i % 100, i // 100, text={'text': f'button {i}'})
+
+
+@benchmark
+def image_buttons(canvas, n):
+    section = CanvasSection(canvas, 0, 0, 1000, 1000)
+    image = {'image': tkinter.PhotoImage(file=ICON)}
+    for i in range(n):
+        CanvasButton(section, i % 100, i // 100, image=image,
+                     text={'text': f'button {i}'})
+
+
+@benchmark
+def cursored_image_buttons(canvas, n):
+    section = CanvasSection(canvas, 0, 0, 1000, 1000)
+    image = tkinter.PhotoImage(file=ICON)
+    for i in range(n):
+        CanvasButton(section, i % 100, i // 100, image={'image': image},
+                     cursored_img=image)
+
+
+@benchmark
+def checkboxes(canvas, n):
+    section = CanvasSection(canvas, 0, 0, 1000, 1000)
+    for i in range(n):
+        SimpleCanvasCheckbox(section, i % 50 * 20, i // 50 * 20, 100, 18,
+                             extra_txt=f'box {i}')
+
+
+@benchmark
+def fit_text_width(canvas, n):
+    font = CountingFont(family='Helvetica', size=10)
+    text = ' '.join(f'word{i}' for i in range(1000))
+    _measurers.clear()
+    for _ in range(max(n // 100, 1)):
+        _fit_text_width(font, text, 300, divider=' ')
+
+
+@benchmark
+def fit_font_height(canvas, n):
+    _font_size_table.clear()
+    for i in range(n):
+        _fit_font_height(CountingFont(family='Helvetica', size=10),
+                         8 + i % 60)
+
+
+@benchmark
+def get_image(canvas, n):
+    image_cache.invalidate()
+    for i in range(n):
+        _get_image(32 + i % 4, 32 + i % 4, ICON)
+
+
+@benchmark
+def destroy_section(canvas, n):
+    section = CanvasSection(canvas, 0, 0, 1000, 1000)
+    for i in range(n):
+        CanvasButton(section, i % 100, i // 100, text={'text': f'button {i}'})
+        section.create_rectangle(i % 100, i // 100, 5, 5)
+    start = time.perf_counter()
+    section.destroy()
+    return time.perf_counter() - start
+
+
+def _run_once(root, name, n, counter=None):
+    """
+        Run a benchmark on a new canvas.
+    :param counter: CountingTk to send the commands of the canvas through.
+    :return: The elapsed seconds.
+    """
+    canvas = tkinter.Canvas(root, width=1000, height=1000)
+    canvas.pack()
+    root.update()
+    if counter is not None:
+        canvas.tk = counter
+    start = time.perf_counter()
+    measured = BENCHMARKS[name](canvas, n)
+    root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    canvas.destroy()
+    return elapsed if measured is None else measured
+
+
+def run_benchmark(name, n):
+    """
+        Run a benchmark in this process, timed once and counted once.
+    :return: Dictionary of the results.
+    """
+    root = tkinter.Tk()
+    elapsed = _run_once(root, name, n)
+    CountingFont.calls = 0
+    counter = CountingTk(root.tk)
+    _run_once(root, name, n, counter)
+    root.destroy()
+    return {
+        'n': n,
+        'seconds': elapsed,
+        'ops_per_second': n / elapsed if elapsed else None,
+        'peak_rss_kb': _peak_rss_kb(),
+        'tcl_calls': counter.calls,
+        'font_calls': CountingFont.calls,
+    }
+
+
+def run(names, n):
+    """
+        Run every benchmark in a new process, so the peak RSS of one does
+        not hide the ones after it.
+    """
+    results = {}
+    for name in names:
+        output = subprocess.check_output(
+            [sys.executable, os.path.abspath(__file__), '--worker', name,
+             '-n', str(n)], text=True)
+        results[name] = json.loads(output)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT,
+                                       text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    print(f'{"benchmark":<24}{"before":>12}{"after":>12}{"ratio":>8}')
+    for name, result in results.items():
+        before = previous.get('results', {}).get(name)
+        if before is None:
+            continue
+        ratio = result['seconds'] / before['seconds'] if before['seconds'] else 0
+        print(f'{name:<24}{before["seconds"]:>12.4f}{result["seconds"]:>12.4f}'
+              f'{ratio:>8.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('-n', type=int, default=1000,
+                        help='Amount of items every benchmark creates.')
+    parser.add_argument('--output', help='Path of the JSON results file.')
+    parser.add_argument('--compare', help='Previous JSON results to compare.')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS),
+                        help='Run only the given benchmarks.')
+    parser.add_argument('--worker', choices=sorted(BENCHMARKS),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        print(json.dumps(run_benchmark(args.worker, args.n)))
+        return
+
+    _ensure_display()
+    results = run(args.only or list(BENCHMARKS), args.n)
+    for name, result in results.items():
+        print(f'{name:<24}{result["seconds"]:>10.4f}s'
+              f'{result["ops_per_second"] or 0:>12.0f}/s'
+              f'{result["tcl_calls"]:>8} Tcl calls'
+              f'{result["font_calls"]:>8} font calls'
+              f'{result["peak_rss_kb"]:>10} KB')
+    report = {'commit': _git_commit(), 'python': platform.python_version(),
+              'tk': tkinter.TkVersion, 'time': time.time(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_does_not_load_heavy_modules():
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         'import tkintercanvaswidgets; tkintercanvaswidgets.CanvasSection'],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    loaded = {line.rpartition('|')[2].strip()
+              for line in result.stderr.splitlines()
+              if line.startswith('import time:')}
+    for name in ('PIL', 'concurrent.futures', 'threading'):
+        assert not any(module == name or module.startswith(f'{name}.')
+                       for module in loaded), f'{name} was imported'
@@ -0,0 +1,27 @@
+from tkinter import HIDDEN
+
+from tkintercanvaswidgets import CanvasSection, PILCanvas, UpdateScheduler
+
+
+def test_changes_of_destroyed_sections_are_dropped():
+    canvas = PILCanvas(100, 100)
+    scheduler = UpdateScheduler.attach(canvas)
+    first = CanvasSection(canvas, 0, 0, 50, 50)
+    tag = first.tag
+    first.itemconfig(first.tag, state=HIDDEN)
+    first.destroy()
+    second = CanvasSection(canvas, 0, 0, 50, 50)
+    assert second.tag == tag
+    rect = second.create_rectangle(0, 0, 10, 10)
+    scheduler.flush()
+    assert canvas.itemcget(rect, 'state') != HIDDEN
+
+
+def test_queued_value_overridden_by_a_tag_change():
+    canvas = PILCanvas(100, 100)
+    UpdateScheduler.attach(canvas)
+    section = CanvasSection(canvas, 0, 0, 50, 50)
+    rect = section.create_rectangle(0, 0, 10, 10)
+    section.itemconfig(rect, state='normal')
+    section.itemconfig(section.tag, state=HIDDEN)
+    assert section.itemcget(rect, 'state') == HIDDEN
@@ -0,0 +1,29 @@
+from tkintercanvaswidgets import CanvasSection, PILCanvas, SectionPool
+
+
+def _build(parent, x, y, width, height):
+    section = CanvasSection(parent, x, y, width, height)
+    section.bind_section('<ButtonRelease-1>', print)
+    return section
+
+
+def test_release_unbinds_handlers_added_after_build():
+    canvas = PILCanvas(100, 100)
+    root = CanvasSection(canvas, 0, 0, 100, 100)
+    pool = SectionPool(_build)
+    for _ in range(3):
+        section = pool.acquire(root, 0, 0, 10, 10)
+        section.bind_section('<ButtonRelease-1>', lambda event: None)
+        pool.release(section)
+    key = (str(section.tag), '<ButtonRelease-1>')
+    assert canvas._bindings[key] == [print]
+
+
+def test_released_sections_are_left_out_of_bbox():
+    canvas = PILCanvas(100, 100)
+    root = CanvasSection(canvas, 0, 0, 5, 5)
+    pool = SectionPool(_build)
+    section = pool.acquire(root, 50, 50, 10, 10)
+    section.create_rectangle(0, 0, 10, 10, fill='red')
+    pool.release(section)
+    assert canvas.bbox('all')[2] < 50
@@ -0,0 +1,42 @@
+from tkinter import HIDDEN, NORMAL
+
+from PIL import Image
+
+from tkintercanvaswidgets import CanvasSection, CanvasButton, PILCanvas
+
+
+def _section():
+    return CanvasSection(PILCanvas(200, 200), 0, 0, 200, 200,
+                         spatial_index=True)
+
+
+def test_created_hidden_items_are_not_found():
+    section = _section()
+    section.create_rectangle(10, 10, 20, 20, state=HIDDEN)
+    visible = section.create_rectangle(10, 10, 30, 30)
+    assert section.items_at_point(15, 15) == [visible]
+
+
+def test_hidden_items_are_measured_when_shown():
+    section = _section()
+    text = section.create_text(50, 50, text='hover', state=HIDDEN)
+    assert section.items_at_point(50, 50) == []
+    section.itemconfig(text, state=NORMAL)
+    assert section.items_at_point(50, 50) == [text]
+
+
+def test_cursored_image_is_found_after_enter():
+    section = _section()
+    image = Image.new('RGBA', (20, 20))
+    button = CanvasButton(section, 10, 10, image={'image': image},
+                          cursored_img=image)
+    button._on_enter(None)
+    assert button.cursored_img in section.items_at_point(15, 15)
+
+
+def test_coords_of_a_tag():
+    section = _section()
+    box = section.create_rectangle(0, 0, 10, 10, tags='box')
+    section.coords('box', 50, 50, 70, 70)
+    assert section.items_at_point(60, 60) == [box]
+    assert section.items_at_point(5, 5) == []
@@ -1 +1,51 @@
-from .canvaswidgets import (CanvasSection, CanvasButton, SimpleCanvasCheckbox)
+from importlib import import_module
+
+# Submodule of every public name, imported on first access so that
+# PIL and the other image dependencies only load when they are used.
+_EXPORTS = {
+    'CanvasSection': 'canvaswidgets',
+    'CanvasButton': 'canvaswidgets',
+    'SimpleCanvasCheckbox': 'canvaswidgets',
+    'CanvasCheckboxGroup': 'canvaswidgets',
+    'measure_buttons': 'canvaswidgets',
+    'BatchItem': '_batch',
+    'ImageCache': '_helpers',
+    'image_cache': '_helpers',
+    'FontRegistry': '_helpers',
+    'font_registry': '_helpers',
+    'VirtualList': 'virtuallist',
+    'UpdateScheduler': 'scheduler',
+    'Animator': 'animation',
+    'Animation': 'animation',
+    'MoveAnimation': 'animation',
+    'CoordsAnimation': 'animation',
+    'ColorAnimation': 'animation',
+    'FadeAnimation': 'animation',
+    'linear': 'animation',
+    'ease_in_out': 'animation',
+    'Profiler': 'profiler',
+    'ImageLoader': 'imageloader',
+    'ImageRequest': 'imageloader',
+    'SpatialIndex': 'spatialindex',
+    'SectionPool': 'sectionpool',
+    'PILCanvas': 'pilcanvas',
+    'ImagePyramid': 'imagepyramid',
+    'LayoutTemplate': 'template',
+    'LayoutInstance': 'template',
+    'Param': 'template',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
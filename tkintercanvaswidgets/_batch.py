@@ -0,0 +1,208 @@
+import re
+from tkinter import _flatten
+
+_TCL_SAFE = re.compile(r'[\w.,:/@%+=~-]+')
+_TCL_SPECIAL = re.compile(r'[\\\[\]{}$";#\s]')
+_TCL_ESCAPES = {'\n': '\\n', '\t': '\\t', '\r': '\\r', '\v': '\\v',
+                '\f': '\\f'}
+
+
+def _tcl_quote(value) -> str:
+    """
+        Quote a value so it is read back as a single word by the Tcl parser.
+    :param value: String, number, BatchItem or a tuple/list of those
+                  (converted to a Tcl list).
+    """
+    if isinstance(value, BatchItem):
+        return value._tcl_ref()
+    if isinstance(value, (tuple, list)):
+        value = ' '.join(_tcl_quote(val) for val in value)
+    else:
+        value = str(value)
+    if not value:
+        return '{}'
+    if _TCL_SAFE.fullmatch(value):
+        return value
+    return _TCL_SPECIAL.sub(
+        lambda match: _TCL_ESCAPES.get(match.group(), '\\' + match.group()),
+        value)
+
+
+class BatchItem:
+    """
+        Item created inside a batch.
+        Can be used everywhere an item id is expected, before the batch
+        is flushed it refers to the pending item, afterwards to its id.
+    """
+    __slots__ = ('_batch', '_key', 'id')
+
+    def __init__(self, batch, key):
+        self._batch = batch
+        self._key = key
+        self.id = None
+
+    def resolve(self) -> int:
+        """
+            Get the canvas id of the item, flushing the batch if needed.
+        """
+        if self.id is None:
+            self._batch.flush()
+        return self.id
+
+    def _tcl_ref(self):
+        if self.id is not None:
+            return str(self.id)
+        return f'$::tcw_batch({self._key})'
+
+    def __str__(self):
+        return str(self.resolve())
+
+    def __int__(self):
+        return self.resolve()
+
+    __index__ = __int__
+
+    def __repr__(self):
+        return f'<BatchItem {self.id if self.id is not None else "pending"}>'
+
+
+class _CanvasBatch:
+    """
+        Collects canvas operations and evaluates them as one Tcl script.
+        Operations that need an answer from the canvas flush the collected
+        script first and are then passed to the canvas itself.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.depth = 0
+        self._path = _tcl_quote(canvas._w)
+        self._script = []
+        self._pending = []
+
+    def __getattr__(self, name):
+        self.flush()
+        return getattr(self.canvas, name)
+
+    def _options(self, kwargs):
+        words = []
+        for key, value in kwargs.items():
+            if value is None:
+                continue
+            if key[-1] == '_':
+                key = key[:-1]
+            if callable(value):
+                value = self.canvas._register(value)
+            words.append(f'-{key} {_tcl_quote(value)}')
+        return words
+
+    def _add(self, *words, **kwargs):
+        self._script.append(' '.join([self._path,
+                                      *(_tcl_quote(word) for word in words),
+                                      *self._options(kwargs)]))
+
+    def _create(self, item_type, args, kwargs):
+        item = BatchItem(self, len(self._pending))
+        self._pending.append(item)
+        self._script.append(f'set ::tcw_batch({item._key}) [')
+        self._add('create', item_type, *_flatten(args), **kwargs)
+        self._script.append(']\n')
+        return item
+
+    def create_arc(self, *args, **kwargs):
+        return self._create('arc', args, kwargs)
+
+    def create_bitmap(self, *args, **kwargs):
+        return self._create('bitmap', args, kwargs)
+
+    def create_image(self, *args, **kwargs):
+        return self._create('image', args, kwargs)
+
+    def create_line(self, *args, **kwargs):
+        return self._create('line', args, kwargs)
+
+    def create_oval(self, *args, **kwargs):
+        return self._create('oval', args, kwargs)
+
+    def create_polygon(self, *args, **kwargs):
+        return self._create('polygon', args, kwargs)
+
+    def create_rectangle(self, *args, **kwargs):
+        return self._create('rectangle', args, kwargs)
+
+    def create_text(self, *args, **kwargs):
+        return self._create('text', args, kwargs)
+
+    def create_window(self, *args, **kwargs):
+        return self._create('window', args, kwargs)
+
+    def itemconfigure(self, tagOrId, cnf=None, **kwargs):
+        if cnf is None and not kwargs:
+            self.flush()
+            return self.canvas.itemconfigure(tagOrId)
+        if cnf:
+            kwargs = {**cnf, **kwargs}
+        self._add('itemconfigure', tagOrId, **kwargs)
+        self._script.append('\n')
+
+    itemconfig = itemconfigure
+
+    def coords(self, *args):
+        args = _flatten(args)
+        if len(args) == 1:
+            self.flush()
+            return self.canvas.coords(*args)
+        self._add('coords', *args)
+        self._script.append('\n')
+
+    def move(self, tagOrId, x, y):
+        self._add('move', tagOrId, x, y)
+        self._script.append('\n')
+
+    def scale(self, tagOrId, xOrigin, yOrigin, xScale, yScale):
+        self._add('scale', tagOrId, xOrigin, yOrigin, xScale, yScale)
+        self._script.append('\n')
+
+    def delete(self, *args):
+        self._add('delete', *_flatten(args))
+        self._script.append('\n')
+
+    def tag_raise(self, *args):
+        self._add('raise', *args)
+        self._script.append('\n')
+
+    def tag_lower(self, *args):
+        self._add('lower', *args)
+        self._script.append('\n')
+
+    def tag_bind(self, tagOrId, sequence=None, func=None, add=None):
+        if sequence is None or func is None:
+            self.flush()
+            return self.canvas.tag_bind(tagOrId, sequence, func, add)
+        if isinstance(func, str):
+            funcid, cmd = None, func
+        else:
+            canvas = self.canvas
+            funcid = canvas._register(func, canvas._substitute, 1)
+            cmd = '%sif {"[%s %s]" == "break"} break\n' % (
+                add and '+' or '', funcid, canvas._subst_format_str)
+        self._add('bind', tagOrId, sequence, cmd)
+        self._script.append('\n')
+        return funcid
+
+    def flush(self):
+        """
+            Evaluate the collected script and resolve the created items.
+        """
+        if not self._script:
+            return
+        script, pending = self._script, self._pending
+        self._script, self._pending = [], []
+        if pending:
+            script.append('set ::tcw_ids [list')
+            script.extend(f' $::tcw_batch({item._key})' for item in pending)
+            script.append(']\nunset ::tcw_batch\nset ::tcw_ids')
+        result = self.canvas.tk.eval(''.join(script))
+        if pending:
+            for item, item_id in zip(pending, self.canvas.tk.splitlist(result)):
+                item.id = int(item_id)
@@ -1,70 +1,575 @@
+import os
+import sys
+import tkinter
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
 from tkinter.font import Font
 
-from PIL import Image, ImageTk
+# threading.RLock is this one, _thread is loaded with the interpreter.
+from _thread import RLock
 
+# PIL is only imported by the image functions, on their first call.
+_RESAMPLE = {}
 
-def _fit_text_width(font: Font, text: str, width: float, divider=None) -> str:
+
+def _resample_filter(name):
+    """
+        Get the PIL resampling filter of a name, LANCZOS for unknown names.
+    """
+    from PIL import Image
+    if not _RESAMPLE:
+        _RESAMPLE.update(dict.fromkeys(['nearest', 'none'], Image.NEAREST))
+        _RESAMPLE.update(dict.fromkeys(['linear', 'bilinear'], Image.BILINEAR))
+        _RESAMPLE.update(dict.fromkeys(['cubic', 'bicubic'], Image.BICUBIC))
+        _RESAMPLE.update(dict.fromkeys(['antialias', 'lanczos'], Image.LANCZOS))
+        _RESAMPLE['box'] = Image.BOX
+        _RESAMPLE['hamming'] = Image.HAMMING
+    return _RESAMPLE.get(name.lower(), Image.LANCZOS)
+
+
+class _TagAllocator:
+    """
+        Hands out unique section tags of a single canvas in constant time.
+    """
+    prefix = '~canvsect~'
+
+    def __init__(self):
+        self._next = 1
+        self._free = []
+
+    def acquire(self):
+        if self._free:
+            return self._free.pop()
+        tag = sys.intern(f'{self.prefix}{self._next}')
+        self._next += 1
+        return tag
+
+    def release(self, tag):
+        """
+            Return a tag for reuse, its items must already be deleted.
+        """
+        self._free.append(tag)
+
+
+class _CanvasState:
+    """
+        Per master canvas bookkeeping shared by all of its sections.
+    """
+
+    def __init__(self):
+        self.tags = _TagAllocator()
+        self.batch = None
+        self.scheduler = None
+        self.animator = None
+        self.loader = None
+        self.wheel_bound = False
+        self.zoom = None
+
+
+_canvas_states = weakref.WeakKeyDictionary()
+
+
+def _tk_interp():
+    """
+        Get the Tcl interpreter of the default root, which the Tk images and
+        fonts created without a master belong to. Objects of a destroyed
+        root do not exist in the next one, so they are cached per
+        interpreter. The interpreter is kept in the keys instead of its id,
+        which a new one could get again.
+    """
+    root = tkinter._default_root
+    return None if root is None else root.tk
+
+
+def _canvas_state(canvas) -> _CanvasState:
+    state = _canvas_states.get(canvas)
+    if state is None:
+        state = _canvas_states[canvas] = _CanvasState()
+    return state
+
+
+@lru_cache(maxsize=None)
+def _slot_names(cls):
+    """
+        Names of the slots of a class and of its bases.
+    """
+    return tuple(name for klass in cls.__mro__
+                 for name in klass.__dict__.get('__slots__', ())
+                 if name != '__weakref__')
+
+
+_styles = {}
+
+
+def _shared_style(defaults, overrides=None):
+    """
+        Read-only mapping of the defaults updated with the overrides,
+        shared between all the widgets using the same values.
+    """
+    style = dict(defaults)
+    if overrides:
+        style.update(overrides)
+    try:
+        key = tuple(sorted(style.items()))
+        shared = _styles.get(key)
+    except TypeError:
+        return MappingProxyType(style)
+    if shared is None:
+        shared = _styles[key] = MappingProxyType(style)
+    return shared
+
+
+class ImageCache:
+    """
+        Bounded LRU cache shared by _get_image.
+        Holds both the decoded source images, shared by the whole process,
+        and the final resized Tk images, kept per Tcl interpreter, evicting
+        the least recently used entries once the byte budget is exceeded.
+        Safe to use from the image loading threads.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+            Constructor for an ImageCache
+        :param max_bytes: Budget, in bytes of pixel data, for all entries.
+        """
+        self._entries = OrderedDict()
+        self._max_bytes = max_bytes
+        self.currbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = RLock()
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+            Get an entry and mark it as recently used.
+        :param key: Key of the entry.
+        :return: The cached value or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        """
+            Store an entry, evicting old ones if the budget is exceeded.
+        :param key: Key of the entry.
+        :param value: Image to store.
+        :param nbytes: Size of the image pixel data in bytes.
+        """
+        with self._lock:
+            if key in self._entries:
+                self.currbytes -= self._entries.pop(key)[1]
+            if nbytes > self._max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self.currbytes += nbytes
+            self._evict()
+
+    def invalidate(self, directory=None):
+        """
+            Drop cached entries.
+        :param directory: Path of the image file to drop, all entries
+                          are dropped when None.
+        """
+        with self._lock:
+            if directory is None:
+                self._entries.clear()
+                self.currbytes = 0
+                return
+            path = os.path.abspath(os.fspath(directory))
+            for key in [key for key in self._entries if key[1] == path]:
+                self.currbytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'entries': len(self._entries), 'bytes': self.currbytes,
+                'max_bytes': self._max_bytes}
+
+    def _evict(self):
+        while self.currbytes > self._max_bytes and self._entries:
+            self.currbytes -= self._entries.popitem(last=False)[1][1]
+
+
+image_cache = ImageCache()
+
+
+class _TextMeasurer:
+    """
+        Caches glyph and word widths of a single font configuration.
+    """
+    max_words = 8192
+
+    def __init__(self, font):
+        self.font = font
+        self.glyphs = {}
+        self.words = {}
+
+    def measure(self, text):
+        width = self.words.get(text)
+        if width is None:
+            if len(self.words) >= self.max_words:
+                self.words.clear()
+            width = self.words[text] = self.font.measure(text)
+        return width
+
+    def glyph(self, char):
+        width = self.glyphs.get(char)
+        if width is None:
+            width = self.glyphs[char] = self.font.measure(char)
+        return width
+
+    def estimate_end(self, text, start, width):
+        """
+            Estimate where a line starting at start ends, by summing glyphs.
+        """
+        total = 0
+        for i in range(start, len(text)):
+            total += self.glyph(text[i])
+            if total > width:
+                return i
+        return len(text)
+
+    def fit(self, text, start, width, divider=None):
+        """
+            Find the end of the longest line starting at start that fits.
+        :param text: The text being wrapped.
+        :param start: Index the line starts at.
+        :param width: The width to fit in.
+        :param divider: Preferred string to break the line after.
+        :return: The index the line ends at, always bigger than start.
+        """
+        length = len(text)
+        if self.measure(text[start:]) <= width:
+            return length
+        # text[start:lo] fits (or is a single character), text[start:hi] does not.
+        lo, hi = start + 1, length
+        guess = self.estimate_end(text, start, width)
+        for probe in (guess, guess + 1):
+            if lo < probe < hi:
+                if self.measure(text[start:probe]) <= width:
+                    lo = probe
+                else:
+                    hi = probe
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self.measure(text[start:mid]) <= width:
+                lo = mid
+            else:
+                hi = mid
+        if divider:
+            index = text.rfind(divider, start, lo + 1)
+            if index > start:
+                return index + len(divider)
+        return lo
+
+
+_measurers = {}
+
+
+def _get_measurer(font: Font) -> _TextMeasurer:
+    key = (font.name, tuple(sorted(font.actual().items())))
+    measurer = _measurers.get(key)
+    if measurer is None:
+        if len(_measurers) >= 64:
+            _measurers.clear()
+        measurer = _measurers[key] = _TextMeasurer(font)
+    return measurer
+
+
+def _fit_text_width(font: Font, text: str, width: float, divider=None,
+                    max_lines=None, ellipsis='\u2026') -> str:
     """
         Takes a string and splits it to lines based on the required width.
     :param font: Font used for the text.
     :param text: The text to be fitted.
     :param width: The width to fit in.
     :param divider: Character to divide the string based on.
+    :param max_lines: Maximal number of lines, the last line is cut
+                      and ends with the ellipsis when the text is longer.
+    :param ellipsis: String marking text that was cut by max_lines.
     :return: The string with \n as needed.
     """
-    new_text = text
-    i = len(text)
-    while font.measure(new_text) > width and i > 0:
-        try:
-            if divider is not None:
-                i = text.rindex(divider, 0, i)
-            else:
-                i -= 1
-        except ValueError:
-            divider = None
-        new_text = text[:i] if i >= len(text) and text[i+1] != ' ' else text[:i-1]
-    if i == len(text):
-        return text
-    elif i == 0 and divider is not None:
-        return _fit_text_width(font, text, width)
-    return f'{text[:i+1]}\n{_fit_text_width(font, text[i + 1:], width, divider)}'
+    measurer = _get_measurer(font)
+    lines = []
+    for paragraph in text.split('\n'):
+        start = 0
+        while True:
+            end = measurer.fit(paragraph, start, width, divider)
+            lines.append(paragraph[start:end])
+            if end >= len(paragraph) or (max_lines is not None and
+                                         len(lines) > max_lines):
+                break
+            start = end
+        if max_lines is not None and len(lines) > max_lines:
+            lines = lines[:max_lines]
+            lines[-1] = _ellipsize(measurer, lines[-1], width, ellipsis)
+            break
+    return '\n'.join(lines)
+
+
+def _ellipsize(measurer, line, width, ellipsis):
+    """
+        Cut the line so it fits the width with the ellipsis appended.
+    """
+    lo, hi = 0, len(line) + 1
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if measurer.measure(line[:mid].rstrip() + ellipsis) <= width:
+            lo = mid
+        else:
+            hi = mid
+    return line[:lo].rstrip() + ellipsis
+
+
+_font_size_table = {}
 
 
 def _fit_font_height(font, height):
     """
         Resize the font based on the height the text should be in.
+        The chosen size is remembered per family, weight, slant and height,
+        so later fonts of the same style are not measured again.
     :param font: Font object.
     :param height: Height for the text to fit in.
     """
-    while font.metrics('linespace') > height and font.cget('size') > 0:
-        font.config(size=font.cget('size')-1)
-    while font.metrics('linespace') < height:
-        font.config(size=font.cget('size')+1)
+    actual = font.actual()
+    key = (actual['family'], actual['weight'], actual['slant'], height)
+    size = _font_size_table.get(key)
+    if size is None:
+        size = _search_font_size(font, height)
+        _font_size_table[key] = size
+    font.config(size=size)
 
 
-def _get_image(w, h, directory, relation=False, resample='antialias', convert=True):
+def _search_font_size(font, height, max_size=4096):
+    """
+        Find the smallest font size whose linespace reaches the height.
+    :param font: Font object, its size is changed during the search.
+    :param height: Height for the text to fit in.
+    :param max_size: Upper limit for the search.
+    :return: The font size.
+    """
+    def reaches(size):
+        font.config(size=size)
+        return font.metrics('linespace') >= height
+
+    lo, hi = 0, max(abs(int(font.cget('size'))), 1)
+    while not reaches(hi):
+        if hi >= max_size:
+            return max_size
+        lo, hi = hi, min(hi * 2, max_size)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if reaches(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def _source_key(directory):
+    """
+        Build the cache key of an image file, None if it can not be cached.
+    :param directory: Path of the image file.
+    """
+    if not isinstance(directory, (str, bytes, os.PathLike)):
+        return None
+    path = os.path.abspath(os.fspath(directory))
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    return 'source', path, mtime
+
+
+def _load_source(directory, key=None):
+    """
+        Decode an image file to RGBA, using the shared cache when possible.
+    :param directory: Path of the image file.
+    :param key: Cache key from _source_key.
+    """
+    from PIL import Image
+    if key is None:
+        return Image.open(directory).convert('RGBA')
+    img = image_cache.get(key)
+    if img is None:
+        img = Image.open(directory).convert('RGBA')
+        image_cache.put(key, img, img.width * img.height * 4)
+    return img
+
+
+def _image_key(w, h, directory, relation=False, resample='antialias'):
+    """
+        Build the cache key of a resized image, None if it can not be cached.
+    """
+    key = _source_key(directory)
+    if key is None:
+        return None
+    return ('image', *key[1:], (int(w), int(h)), resample.lower(),
+            bool(relation), _tk_interp())
+
+
+def _prepare_image(w, h, directory, relation=False, resample='antialias',
+                   key=None):
+    """
+        Decode and resize an image file without creating a Tk image,
+        so it can run outside of the Tk thread.
+    :param key: Cache key from _image_key.
+    :return: The resized PIL image.
+    """
     w, h = int(w), int(h)
-    img = Image.open(directory).convert('RGBA')
+    img = _load_source(directory, None if key is None else ('source', *key[1:3]))
     if relation:
         width, height = img.size
         relation = height/width
         h = int(w*relation)
-    return _resize_image(w, h, img, convert, resample=resample)
+    return _resize_image(w, h, img, False, resample=resample)
+
+
+def _get_image(w, h, directory, relation=False, resample='antialias', convert=True):
+    key = _image_key(w, h, directory, relation, resample)
+    if not convert:
+        return _prepare_image(w, h, directory, relation, resample, key)
+    if key is not None:
+        cached = image_cache.get(key)
+        if cached is not None:
+            return cached
+    from PIL import ImageTk
+    resized = _prepare_image(w, h, directory, relation, resample, key)
+    img = ImageTk.PhotoImage(resized)
+    if key is not None:
+        image_cache.put(key, img, resized.width * resized.height * 4)
+    return img
 
 
 def _resize_image(w, h, img, convert=True, resample='antialias'):
-    resampledict = dict.fromkeys(['nearest', 'none'], Image.NEAREST)
-    resampledict.update(dict.fromkeys(['linear', 'bilinear'], Image.BILINEAR))
-    resampledict.update(dict.fromkeys(['cubic', 'bicubic'], Image.BICUBIC))
-    resampledict.update(dict.fromkeys(['antialias', 'lanczos'], Image.LANCZOS))
-    resampledict['box'] = Image.BOX
-    resampledict['hamming'] = Image.HAMMING
-
-    if resample.lower() in resampledict:
-        resized_img = img.resize((int(w), int(h)), resampledict[resample.lower()])
-    else:
-        resized_img = img.resize((int(w), int(h)), Image.LANCZOS)
+    resized_img = img.resize((int(w), int(h)), _resample_filter(resample))
     if convert:
+        from PIL import ImageTk
         return ImageTk.PhotoImage(resized_img)
     else:
         return resized_img
+
+
+class SharedFont(Font):
+    """
+        Font handed out by a FontRegistry. It is shared by all the widgets
+        of the same style, so it can not be configured once it is fitted.
+    """
+    _frozen = False
+
+    def configure(self, **options):
+        if self._frozen and options:
+            raise TypeError('Shared fonts can not be changed, '
+                            'acquire another one from the font registry.')
+        return super().configure(**options)
+
+    config = configure
+
+
+class FontRegistry:
+    """
+        Reference counted shared fonts, one named Tk font per family,
+        size (or height to fit), weight, slant, underline, overstrike
+        and Tcl interpreter of the default root.
+        A font is deleted once every widget using it released it.
+    """
+
+    def __init__(self):
+        self._fonts = {}
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._fonts)
+
+    def acquire(self, height=None, family=None, size=None, weight='normal',
+                slant='roman', underline=False, overstrike=False) -> SharedFont:
+        """
+            Get the shared font of a style, creating it if needed.
+            Every acquire must be paired with a release.
+        :param height: Height for the text to fit in, the size is searched
+                       (once per style and height) when given.
+        :param family: Font family, the Tk default when None.
+        :param size: Font size, used when there is no height.
+        """
+        if height is not None:
+            size = None
+        key = (family, size, height, weight, slant, bool(underline),
+               bool(overstrike), _tk_interp())
+        entry = self._fonts.get(key)
+        if entry is None:
+            options = {'weight': weight, 'slant': slant,
+                       'underline': underline, 'overstrike': overstrike}
+            if family is not None:
+                options['family'] = family
+            if size is not None:
+                options['size'] = size
+            font = SharedFont(**options)
+            if height is not None:
+                _fit_font_height(font, height)
+            font._frozen = True
+            entry = self._fonts[key] = [font, 0]
+            self._keys[font.name] = key
+        entry[1] += 1
+        return entry[0]
+
+    def acquire_like(self, font, height=None) -> SharedFont:
+        """
+            Get the shared font with the style of another font,
+            without changing that font.
+        :param font: Font object whose family, weight, slant, underline and
+                     overstrike are used, and its size when there is no
+                     height.
+        :param height: Height for the text to fit in.
+        """
+        key = self._keys.get(getattr(font, 'name', None))
+        if key is not None and key[2] == height and key[-1] is _tk_interp():
+            # Already a shared font of this style and height.
+            self._fonts[key][1] += 1
+            return font
+        actual = font.actual()
+        return self.acquire(height, actual['family'], actual['size'],
+                            actual['weight'], actual['slant'],
+                            actual['underline'], actual['overstrike'])
+
+    def release(self, font):
+        """
+            Give back a font got from acquire, it is deleted once unused.
+            Fonts that do not belong to the registry are ignored.
+        """
+        key = self._keys.get(getattr(font, 'name', None))
+        if key is None:
+            return
+        entry = self._fonts[key]
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self._fonts[key]
+            del self._keys[font.name]
+
+    def refcount(self, font) -> int:
+        key = self._keys.get(getattr(font, 'name', None))
+        return 0 if key is None else self._fonts[key][1]
+
+
+font_registry = FontRegistry()
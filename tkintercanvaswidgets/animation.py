@@ -0,0 +1,298 @@
+import time
+from tkinter import HIDDEN, NORMAL
+
+from ._batch import _CanvasBatch
+from ._helpers import _canvas_state
+
+_FADE_STIPPLES = ('gray12', 'gray25', 'gray50', 'gray75', '')
+
+
+def linear(progress):
+    return progress
+
+
+def ease_in_out(progress):
+    return progress * progress * (3 - 2 * progress)
+
+
+class Animation:
+    """
+        Base of the animations driven by an Animator.
+    """
+
+    def __init__(self, item, duration, easing=None, on_done=None):
+        """
+        :param item: Id or tag of the animated item.
+        :param duration: Duration of the animation in seconds.
+        :param easing: Function mapping the time progress (0 to 1)
+                       to the animation progress.
+        :param on_done: Callback function to run when the animation ends.
+        """
+        self.item = item
+        self.duration = duration
+        self.easing = easing or linear
+        self.on_done = on_done
+        self.cancelled = False
+        self._start = None
+
+    def cancel(self):
+        self.cancelled = True
+
+    def begin(self, canvas, now):
+        self._start = now
+
+    def step(self, now, frame):
+        """
+            Add the changes of the animation at a given time to the frame.
+        :return: Whether the animation is done.
+        """
+        if self.duration <= 0:
+            progress = 1.0
+        else:
+            progress = min((now - self._start) / self.duration, 1.0)
+        self.apply(self.easing(progress), frame)
+        return progress >= 1.0
+
+    def apply(self, progress, frame):
+        raise NotImplementedError
+
+
+class MoveAnimation(Animation):
+    def __init__(self, item, x, y, duration, easing=None, on_done=None,
+                 section=None):
+        """
+        :param x: Offset to move by on the x axis.
+        :param y: Offset to move by on the y axis.
+        :param section: CanvasSection whose cached origin follows the item.
+        """
+        super().__init__(item, duration, easing, on_done)
+        self.x = x
+        self.y = y
+        self.section = section
+        self._moved = (0, 0)
+
+    def apply(self, progress, frame):
+        x, y = self.x * progress, self.y * progress
+        offx, offy = x - self._moved[0], y - self._moved[1]
+        self._moved = (x, y)
+        frame.move(self.item, offx, offy)
+        if self.section is not None:
+            self.section._shift_origin(offx, offy)
+
+
+class CoordsAnimation(Animation):
+    def __init__(self, item, coords, duration, easing=None, on_done=None):
+        """
+        :param coords: Target coordinates of the item on the canvas.
+        """
+        super().__init__(item, duration, easing, on_done)
+        self.target = tuple(coords)
+        self._origin = None
+
+    def begin(self, canvas, now):
+        super().begin(canvas, now)
+        self._origin = tuple(canvas.coords(self.item))
+
+    def apply(self, progress, frame):
+        frame.coords[self.item] = tuple(
+            start + (end - start) * progress
+            for start, end in zip(self._origin, self.target))
+
+
+class ColorAnimation(Animation):
+    def __init__(self, item, color, duration, easing=None, on_done=None,
+                 option='fill'):
+        """
+        :param color: Target color.
+        :param option: The color option that is animated.
+        """
+        super().__init__(item, duration, easing, on_done)
+        self.color = color
+        self.option = option
+        self._origin = None
+        self._target = None
+
+    def begin(self, canvas, now):
+        super().begin(canvas, now)
+        self._origin = _rgb(canvas, canvas.itemcget(self.item, self.option))
+        self._target = _rgb(canvas, self.color)
+
+    def apply(self, progress, frame):
+        rgb = (round(start + (end - start) * progress)
+               for start, end in zip(self._origin, self._target))
+        frame.config(self.item, **{self.option: '#%02x%02x%02x' % tuple(rgb)})
+
+
+class FadeAnimation(Animation):
+    def __init__(self, item, show, duration, easing=None, on_done=None):
+        """
+            Show or hide an item gradually using stipple patterns.
+            Only items that support the stipple option can fade.
+        :param show: Fade in when True, fade out otherwise.
+        """
+        super().__init__(item, duration, easing, on_done)
+        self.show = show
+
+    def apply(self, progress, frame):
+        if not self.show:
+            progress = 1 - progress
+        if progress >= 1.0:
+            frame.config(self.item, stipple='', state=NORMAL)
+        elif progress <= 0.0:
+            frame.config(self.item, stipple='', state=HIDDEN)
+        else:
+            level = min(int(progress * (len(_FADE_STIPPLES) - 1)),
+                        len(_FADE_STIPPLES) - 2)
+            frame.config(self.item, stipple=_FADE_STIPPLES[level],
+                         state=NORMAL)
+
+
+def _rgb(canvas, color):
+    if hasattr(canvas, 'winfo_rgb'):
+        return tuple(val // 257 for val in canvas.winfo_rgb(color))
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+class _Frame:
+    """
+        Changes of all the animations in a single frame, merged per item.
+    """
+
+    def __init__(self):
+        self.moves = {}
+        self.coords = {}
+        self.configs = {}
+
+    def move(self, item, x, y):
+        if item in self.moves:
+            prevx, prevy = self.moves[item]
+            x, y = prevx + x, prevy + y
+        self.moves[item] = (x, y)
+
+    def config(self, item, **kwargs):
+        self.configs.setdefault(item, {}).update(kwargs)
+
+    def send(self, dest):
+        for item, (x, y) in self.moves.items():
+            if x or y:
+                dest.move(item, x, y)
+        for item, coords in self.coords.items():
+            dest.coords(item, *coords)
+        for item, options in self.configs.items():
+            dest.itemconfig(item, **options)
+
+
+class Animator:
+    """
+        Drives all the animations of a canvas from a single fixed rate timer.
+        Every frame, the changes of all active animations are merged per item
+        and sent to Tcl as one script. When the timer falls behind, frames
+        are skipped (the animations jump to where they should be) and counted
+        in dropped_frames.
+    """
+
+    def __init__(self, canvas, fps=60):
+        """
+            Constructor for an Animator, use attach to share it between
+            the sections of a canvas.
+        :param canvas: The master canvas.
+        :param fps: Frames per second.
+        """
+        self.canvas = canvas
+        self.fps = fps
+        self.frames = 0
+        self.dropped_frames = 0
+        self._animations = []
+        self._after_id = None
+        self._next_frame = None
+
+    @classmethod
+    def attach(cls, canvas, fps=None):
+        """
+            Get the animator of a canvas, creating it if needed.
+        :param canvas: The master canvas or a section on it.
+        :param fps: Frames per second, unchanged when None.
+        """
+        if hasattr(canvas, 'master_canvas'):
+            canvas = canvas.master_canvas()
+        state = _canvas_state(canvas)
+        if state.animator is None:
+            state.animator = cls(canvas, fps or 60)
+        elif fps is not None:
+            state.animator.fps = fps
+        return state.animator
+
+    @property
+    def active(self):
+        return len(self._animations)
+
+    def start(self, animation: Animation) -> Animation:
+        """
+            Start running an animation.
+        """
+        now = time.perf_counter()
+        animation.begin(self.canvas, now)
+        self._animations.append(animation)
+        if self._after_id is None:
+            self._next_frame = now
+            self._after_id = self.canvas.after_idle(self._tick)
+        return animation
+
+    def move(self, item, x, y, duration, easing=None, on_done=None):
+        return self.start(MoveAnimation(item, x, y, duration, easing, on_done))
+
+    def coords(self, item, coords, duration, easing=None, on_done=None):
+        return self.start(CoordsAnimation(item, coords, duration, easing,
+                                          on_done))
+
+    def fill(self, item, color, duration, easing=None, on_done=None,
+             option='fill'):
+        return self.start(ColorAnimation(item, color, duration, easing,
+                                         on_done, option))
+
+    def fade(self, item, show, duration, easing=None, on_done=None):
+        return self.start(FadeAnimation(item, show, duration, easing, on_done))
+
+    def cancel_all(self):
+        for animation in self._animations:
+            animation.cancel()
+
+    def _tick(self):
+        self._after_id = None
+        now = time.perf_counter()
+        interval = 1 / self.fps
+        behind = int((now - self._next_frame) / interval)
+        if behind > 0:
+            self.dropped_frames += behind
+            self._next_frame += behind * interval
+        self._next_frame += interval
+
+        frame = _Frame()
+        running, finished = [], []
+        for animation in self._animations:
+            if animation.cancelled:
+                continue
+            if animation.step(now, frame):
+                finished.append(animation)
+            else:
+                running.append(animation)
+        self._animations = running
+        self._send(frame)
+        self.frames += 1
+
+        for animation in finished:
+            if animation.on_done is not None:
+                animation.on_done()
+        if self._animations and self._after_id is None:
+            delay = max(self._next_frame - time.perf_counter(), 0)
+            self._after_id = self.canvas.after(int(delay * 1000), self._tick)
+
+    def _send(self, frame):
+        dest = _canvas_state(self.canvas).batch
+        if dest is not None or not hasattr(self.canvas, 'tk'):
+            frame.send(dest or self.canvas)
+            return
+        batch = _CanvasBatch(self.canvas)
+        frame.send(batch)
+        batch.flush()
@@ -1,17 +1,193 @@
 import time
-import threading
-from typing import Callable
+import weakref
+from array import array
+from contextlib import contextmanager
+from functools import partial
+from collections.abc import Callable
 from operator import itemgetter
-from tkinter import HIDDEN, NORMAL, NW, N, W, CENTER
-from tkinter.font import Font
+from tkinter import HIDDEN, NORMAL, NW, N, W, CENTER, TclError
 
-from PIL import ImageTk, Image
+from .animation import Animator, MoveAnimation
+from ._batch import _CanvasBatch, BatchItem, _tcl_quote
+from .imagepyramid import ImagePyramid, _ZoomedImages
+from .spatialindex import SpatialIndex
+from ._helpers import (_resize_image, _fit_text_width,
+                       _get_image, _canvas_state, _shared_style, _slot_names,
+                       font_registry)
 
-from ._helpers import _fit_font_height, _resize_image, _fit_text_width, _get_image
+_CHECKBOX_COLORS = {'font': 'black', 'background': 'black', 'check': 'white'}
+# Wheel events are merged into one <<MouseWheel>> event per frame.
+_WHEEL_MS = 16
+_wheel_pending = {}
+
+
+def _flush_wheel(widget):
+    x, y, delta = _wheel_pending.pop(widget)
+    try:
+        widget.event_generate('<<MouseWheel>>', x=x, y=y, time=delta)
+    except TclError:
+        # The widget was destroyed in the meantime.
+        pass
+
+
+def _wheel_event(func, event):
+    # The summed delta of a <<MouseWheel>> event travels in its time field.
+    event.delta = event.time
+    return func(event)
+
+
+class _EventDelegator:
+    """
+        Dispatches events bound once on a section tag to the handlers
+        registered for the individual items of the section.
+    """
+
+    def __init__(self, section):
+        self._section = section
+        self._handlers = {}
+        self._pending = []
+
+    def register(self, item, sequence, func):
+        """
+            Register the handler of an item for an event sequence.
+        :param item: Id of the item.
+        :param sequence: Event sequence.
+        :param func: Callback function for the event.
+        """
+        handlers = self._handlers.get(sequence)
+        if handlers is None:
+            handlers = self._handlers[sequence] = {}
+            section = self._section
+            section.tag_bind(section.tag, sequence,
+                             partial(self._dispatch, sequence), add=True)
+        if isinstance(item, BatchItem) and item.id is None:
+            self._pending.append((item, sequence, func))
+        else:
+            handlers[int(item)] = func
+
+    def unregister(self, item):
+        """
+            Remove all the handlers of an item.
+        """
+        if self._pending:
+            self._resolve()
+        item = int(item)
+        for handlers in self._handlers.values():
+            handlers.pop(item, None)
+
+    def _resolve(self):
+        pending, self._pending = self._pending, []
+        for item, sequence, func in pending:
+            self._handlers[sequence][int(item)] = func
+
+    def _dispatch(self, sequence, event):
+        if self._pending:
+            self._resolve()
+        current = self._section._canvas.find_withtag('current')
+        if current:
+            func = self._handlers[sequence].get(current[0])
+            if func is not None:
+                return func(event)
+
+
+def _measure_items(canvas, items):
+    """
+        Get the bounding boxes of many items, with a single Tcl script
+        when the canvas is a Tk widget.
+    :return: Dictionary of item to bbox, None for the items without one.
+    """
+    state = _canvas_state(canvas)
+    if state.scheduler is not None and state.scheduler._pending:
+        state.scheduler.flush()
+    if state.batch is not None:
+        state.batch.flush()
+    if not (hasattr(canvas, 'tk') and hasattr(canvas, '_w')):
+        return {item: canvas.bbox(item) for item in items}
+    path = _tcl_quote(canvas._w)
+    script = ''.join(f' [{path} bbox {item}]' for item in items)
+    splitlist = canvas.tk.splitlist
+    return {item: tuple(int(val) for val in splitlist(box)) or None
+            for item, box in zip(items, splitlist(canvas.tk.eval('list' +
+                                                                 script)))}
+
+
+def _item_states(canvas, tag):
+    """
+        Get the state of every item with a tag, with a single Tcl script
+        when the canvas is a Tk widget.
+    :return: Dictionary of item id to state, '' for the items that use
+             the state of the canvas.
+    """
+    state = _canvas_state(canvas)
+    if state.scheduler is not None and state.scheduler._pending:
+        state.scheduler.flush()
+    if state.batch is not None:
+        state.batch.flush()
+    if not (hasattr(canvas, 'tk') and hasattr(canvas, '_w')):
+        return {item: canvas.itemcget(item, 'state')
+                for item in canvas.find_withtag(tag)}
+    path = _tcl_quote(canvas._w)
+    values = canvas.tk.splitlist(canvas.tk.eval(
+        f'concat {{*}}[lmap i [{path} find withtag {_tcl_quote(tag)}] '
+        f'{{list $i [{path} itemcget $i -state]}}]'))
+    return {int(values[i]): str(values[i + 1])
+            for i in range(0, len(values), 2)}
+
+
+class _Throttle:
+    """
+        Event handler that calls a function at most max_hz times a second.
+        Events arriving in between are merged, the function gets the latest
+        one with the deltas of all of them summed.
+    """
+
+    def __init__(self, widget, func, max_hz):
+        self._widget = widget
+        self._func = func
+        self._interval = 1 / max_hz
+        self._last = float('-inf')
+        self._event = None
+        self._delta = 0
+        self._after_id = None
+
+    def __call__(self, event):
+        delta = getattr(event, 'delta', None)
+        if isinstance(delta, int):
+            self._delta += delta
+        self._event = event
+        if self._after_id is None:
+            wait = self._last + self._interval - time.perf_counter()
+            if wait <= 0:
+                return self._fire()
+            self._after_id = self._widget.after(int(wait * 1000) + 1,
+                                                self._fire)
+
+    def _fire(self):
+        self._after_id = None
+        event, self._event = self._event, None
+        if event is None:
+            return
+        if isinstance(getattr(event, 'delta', None), int):
+            event.delta = self._delta
+        self._delta = 0
+        self._last = time.perf_counter()
+        return self._func(event)
+
+    def cancel(self):
+        if self._after_id is not None:
+            self._widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._event = None
 
 
 class CanvasSection:
-    def __init__(self, parent, x, y, width, height, tag=None):
+    __slots__ = ('parent', 'tag', '_initx', '_inity', '_width', '_height',
+                 '_events', '_children', '_delegator', '_index', '_canvas',
+                 '_absx', '_absy', '_state', '_auto_tag', '_item_tags', '_area',
+                 '_throttles', '_zoom', '__weakref__')
+
+    def __init__(self, parent, x, y, width, height, tag=None,
+                 delegate_events=False, spatial_index=False):
         """
             Constructor for a CanvasSection
         :param parent: Parent canvas that will be used.
@@ -20,28 +196,60 @@ class CanvasSection:
         :param width: The width of the section.
         :param height: The height of the section.
         :param tag: Tag for the elements in this section.
+        :param delegate_events: Bind each event type once on this section
+                                and dispatch it to the CanvasButtons drawn in
+                                it (and in its nested sections) by item id,
+                                instead of binding every button item.
+        :param spatial_index: Keep the bounding boxes of the items drawn in
+                              this section (and in its nested sections) in a
+                              SpatialIndex, answering items_in_rect,
+                              items_at_point and nearest without Tcl calls.
         """
         self.parent = parent
         self._initx = x
         self._inity = y
         self._width = width
         self._height = height
-        self._events = []
+        # Bound sequences, with the (tag, funcid) pairs of their handlers.
+        self._events = None
+        self._throttles = None
+        self._children = None
+        self._delegator = None
+        self._index = None
+        self._zoom = 1.0
+        if isinstance(parent, CanvasSection):
+            self._delegator = parent._delegator
+            self._index = parent._index
+            self._zoom = parent._zoom
+            self._canvas = parent._canvas
+            self._absx = parent._absx + x
+            self._absy = parent._absy + y
+            parent_tags = parent._item_tags
+            if parent._children is None:
+                parent._children = weakref.WeakSet()
+            parent._children.add(self)
+        else:
+            self._canvas = parent
+            self._absx = x
+            self._absy = y
+            parent_tags = ()
+        self._state = _canvas_state(self._canvas)
+        self._auto_tag = tag is None
         if not isinstance(tag, tuple) and tag is not None:
             tag = (tag, )
         elif tag is None:
-            tag_prefix = '~canvsect~'
-            i = 1
-            tag = f'{tag_prefix}{i}'
-            while len(parent.find_withtag(tag)) != 0:
-                i += 1
-                tag = f'{tag_prefix}{i}'
-            tag = (tag, )
+            tag = (self._state.tags.acquire(), )
         self.tag = tag
-        self._area = self.parent.create_rectangle(self._initx, self._inity,
-                                                  self._initx + width,
-                                                  self._inity + height, fill='',
-                                                  outline='', tags=tag)
+        self._item_tags = (*tag, *parent_tags)
+        self._area = self._dest().create_rectangle(self._absx, self._absy,
+                                                   self._absx + width,
+                                                   self._absy + height,
+                                                   fill='', outline='',
+                                                   tags=self._item_tags)
+        if delegate_events:
+            self._delegator = _EventDelegator(self)
+        if spatial_index:
+            self._index = SpatialIndex(partial(_measure_items, self._canvas))
 
     @property
     def width(self):
@@ -51,55 +259,128 @@ class CanvasSection:
     def height(self):
         return self._height
 
+    def _dest(self):
+        """
+            Object that receives the item operations of this section,
+            the active batch of the master canvas or the canvas itself.
+        """
+        return self._state.batch or self._canvas
+
+    def _query_dest(self):
+        """
+            Same as _dest, for operations that read from the canvas.
+            Changes queued by an UpdateScheduler are applied first.
+        """
+        scheduler = self._state.scheduler
+        if scheduler is not None and scheduler._pending:
+            scheduler.flush()
+        return self._state.batch or self._canvas
+
+    @contextmanager
+    def batch(self):
+        """
+            Collect the item operations made on the master canvas while
+            inside the context and send them to Tcl as a single script.
+            Items created inside the batch are returned as BatchItem objects
+            that are usable as item ids. Operations that need an answer from
+            the canvas (bbox, itemcget, ...) flush the collected operations.
+            Nested batches join the outermost one.
+        """
+        canvas = self.master_canvas()
+        if not hasattr(canvas, 'tk'):
+            # Canvases without a Tcl interpreter take the operations at once.
+            yield canvas
+            return
+        state = self._state
+        if state.batch is None:
+            state.batch = _CanvasBatch(canvas)
+        state.batch.depth += 1
+        try:
+            yield state.batch
+        finally:
+            batch = state.batch
+            batch.depth -= 1
+            if batch.depth == 0:
+                state.batch = None
+                batch.flush()
+
     def update_item_params(self, kwargs):
         """
-            Add more tags to the item.
-        :param kwargs:
-        :return:
+            Add the tags of this section and its parent sections to the item.
+        :param kwargs: Keyword arguments of the item creation.
         """
-        tags = 'tags'
-        if self.tag is not None:
-            if tags in kwargs:
-                if type(kwargs[tags]) == tuple:
-                    kwargs[tags] += (self.tag, )
-                elif type(kwargs[tags]) == str:
-                    kwargs[tags] = (kwargs[tags], *self.tag)
-            else:
-                kwargs[tags] = self.tag
+        tags = kwargs.get('tags')
+        if tags is None:
+            kwargs['tags'] = self._item_tags
+        elif isinstance(tags, str):
+            kwargs['tags'] = (tags, *self._item_tags)
+        else:
+            kwargs['tags'] = (*tags, *self._item_tags)
+
+    def _indexed(self, item, kwargs, coords=None):
+        """
+            Add a new item to the spatial index, if the section has one.
+        :param coords: Canvas coordinates of the item, None for the items
+                       that are measured by the canvas (text and images).
+        """
+        if self._index is not None:
+            box = None
+            if coords is not None:
+                box = (min(coords[0::2]), min(coords[1::2]),
+                       max(coords[0::2]), max(coords[1::2]))
+            self._index.add(item, box, kwargs['tags'],
+                            kwargs.get('state') == HIDDEN)
+        return item
 
     def create_text(self, x, y, **kwargs):
         self.update_item_params(kwargs)
-        return self.parent.create_text(self._initx + x, self._inity + y,
-                                       **kwargs)
+        return self._indexed(self._dest().create_text(
+            self._absx + x, self._absy + y, **kwargs), kwargs)
 
     def create_image(self, x, y, **kwargs):
+        """
+            Create an image item, the image can be an ImagePyramid whose
+            level follows the zoom of the section (see scale).
+        """
         self.update_item_params(kwargs)
-        return self.parent.create_image(self._initx + x, self._inity + y,
-                                        **kwargs)
+        pyramid = kwargs.get('image')
+        if isinstance(pyramid, ImagePyramid):
+            kwargs['image'] = pyramid.image(self._zoom,
+                                            hasattr(self._canvas, 'tk'))
+        item = self._indexed(self._dest().create_image(
+            self._absx + x, self._absy + y, **kwargs), kwargs)
+        if isinstance(pyramid, ImagePyramid):
+            _ZoomedImages.attach(self._canvas).add(item, pyramid, self._zoom,
+                                                   kwargs['tags'])
+        return item
 
     def create_line(self, *args, **kwargs):
-        args = (arg + self._initx if i % 2 == 0 else arg + self._inity
-                for i, arg in enumerate(args))
+        args = [arg + self._absx if i % 2 == 0 else arg + self._absy
+                for i, arg in enumerate(args)]
         self.update_item_params(kwargs)
-        self.parent.create_line(*args, **kwargs)
+        return self._indexed(self._dest().create_line(*args, **kwargs),
+                             kwargs, args)
 
     def create_rectangle(self, left, top, right, bottom, **kwargs):
         self.update_item_params(kwargs)
-        return self.parent.create_rectangle(self._initx + left, self._inity + top,
-                                            self._initx + right, self._inity + bottom,
-                                            **kwargs)
+        coords = (self._absx + left, self._absy + top,
+                  self._absx + right, self._absy + bottom)
+        return self._indexed(self._dest().create_rectangle(*coords, **kwargs),
+                             kwargs, coords)
 
     def create_arc(self, x, y, xsize, ysize, **kwargs):
         self.update_item_params(kwargs)
-        return self.parent.create_arc(x + self._initx, y + self._inity,
-                                      xsize + self._initx, ysize + self._inity,
-                                      **kwargs)
+        coords = (x + self._absx, y + self._absy,
+                  xsize + self._absx, ysize + self._absy)
+        return self._indexed(self._dest().create_arc(*coords, **kwargs),
+                             kwargs, coords)
 
     def create_oval(self, x, y, xsize, ysize, **kwargs):
         self.update_item_params(kwargs)
-        return self.parent.create_oval(x + self._initx, y + self._inity,
-                                       xsize + self._initx, ysize + self._inity,
-                                       **kwargs)
+        coords = (x + self._absx, y + self._absy,
+                  xsize + self._absx, ysize + self._absy)
+        return self._indexed(self._dest().create_oval(*coords, **kwargs),
+                             kwargs, coords)
 
     def create_button(self, x, y, **kwargs):
         self.update_item_params(kwargs)
@@ -112,36 +393,42 @@ class CanvasSection:
         :param item: Item that exists in the canvas.
         :return:
         """
-        if self.parent.itemcget(item, 'state') != HIDDEN:
-            borders = self.parent.bbox(item)
-            return tuple(val-(self._inity if i % 2 else self._initx)
+        dest = self._query_dest()
+        if dest.itemcget(item, 'state') != HIDDEN:
+            borders = dest.bbox(item)
+            return tuple(val-(self._absy if i % 2 else self._absx)
                          for i, val in enumerate(borders))
 
     def coords(self, item, x1=None, y1=None, x2=None, y2=None):
         if all(var is None for var in (x1, y1, x2, y2)):
-            coords = self.parent.coords(item)
+            coords = self._query_dest().coords(item)
             if len(coords) == 2:
-                coords = coords[0] - self._initx, coords[1] - self._inity
+                coords = coords[0] - self._absx, coords[1] - self._absy
             else:
                 coords = (
-                    coords[0] - self._initx, coords[1] - self._inity,
-                    coords[2] - self._initx, coords[3] - self._inity)
+                    coords[0] - self._absx, coords[1] - self._absy,
+                    coords[2] - self._absx, coords[3] - self._absy)
             return coords
         else:
             if x2 is None or y2 is None:
-                return self.parent.coords(item, self._initx + x1, self._inity + y1)
-            return self.parent.coords(item, self._initx + x1, self._inity + y1,
-                                      self._initx + x2, self._inity + y2)
+                if self._index is not None:
+                    self._index.update(item, None)
+                return self._dest().coords(item, self._absx + x1, self._absy + y1)
+            coords = (self._absx + x1, self._absy + y1,
+                      self._absx + x2, self._absy + y2)
+            if self._index is not None:
+                self._index.update(item, coords)
+            return self._dest().coords(item, *coords)
 
     def show_borders(self):
         border_color = {'outline': 'black'}
         self.create_rectangle(0, 0, self.width, self.height, **border_color)
 
     def tag_raise(self, item):
-        self.parent.tag_raise(item)
+        self._dest().tag_raise(item)
 
     def tag_lower(self, item):
-        self.parent.tag_lower(item)
+        self._dest().tag_lower(item)
 
     def lower_section(self):
         self.tag_lower(self.tag)
@@ -152,57 +439,250 @@ class CanvasSection:
     def bind_section(self, event, func):
         self.tag_bind(self.tag, event, func, add=True)
 
+    def bind_throttled(self, event, func, max_hz=60):
+        """
+            Bind a function to an event on the section, calling it at most
+            max_hz times a second. Events in between are merged into the
+            next call, which gets the latest event (so the latest
+            coordinates) with the deltas of the merged events summed.
+        :param event: Event sequence, like '<Motion>' or '<MouseWheel>'.
+        :param func: Callback function for the event.
+        :param max_hz: Maximal amount of calls per second.
+        """
+        throttle = _Throttle(self._canvas, func, max_hz)
+        if self._throttles is None:
+            self._throttles = []
+        self._throttles.append(throttle)
+        self.bind_section(event, throttle)
+
     def itemconfig(self, item, **kwargs):
-        self.parent.itemconfig(item, **kwargs)
+        scheduler = self._state.scheduler
+        if scheduler is not None:
+            scheduler.itemconfig(item, **kwargs)
+        else:
+            self._dest().itemconfig(item, **kwargs)
+        if self._index is not None:
+            self._index.configure(item, kwargs)
 
     def tag_bind(self, item, event, func, add=None):
         if event != '<MouseWheel>':
-            self._events.append(event)
-            self.parent.tag_bind(item, event, func, add)
-        else:
+            if self._events is None:
+                self._events = {}
+            handlers = self._events.setdefault(event, [])
+            if not add:
+                handlers[:] = [handler for handler in handlers
+                               if handler[0] != item]
+            funcid = self._dest().tag_bind(item, event, func, add)
+            handlers.append((item, funcid))
+            return funcid
+        if not self._state.wheel_bound:
+            self._state.wheel_bound = True
             self.bind_all(event, self.mousescroll)
-            self.tag_bind(item, f'<{event}>', func, add)
+        return self.tag_bind(item, '<<MouseWheel>>',
+                             partial(_wheel_event, func), add)
 
     def bind(self, event, func, add=None):
-        self.parent.bind(event, func, add)
+        self._canvas.bind(event, func, add)
 
     def move(self, item, x, y):
-        self.parent.move(item, x, y)
+        self._dest().move(item, x, y)
+        if self._index is not None:
+            self._index.move(item, x, y)
+
+    def move_section(self, x, y):
+        """
+            Move the section, and everything drawn in it, by an offset.
+            The cached origins of all nested sections are updated at once.
+        :param x: Offset on the x axis.
+        :param y: Offset on the y axis.
+        """
+        self._dest().move(self.tag, x, y)
+        self._shift_origin(x, y)
+
+    def _shift_origin(self, x, y):
+        """
+            Update the cached origins after the items of the section moved.
+        """
+        self._initx += x
+        self._inity += y
+        if self._index is not None:
+            self._index.move(self.tag, x, y)
+        sections = [self]
+        while sections:
+            section = sections.pop()
+            section._absx += x
+            section._absy += y
+            if section._children:
+                sections.extend(section._children)
+
+    @property
+    def zoom(self):
+        return self._zoom
+
+    def scale(self, factor, origin=(0, 0)):
+        """
+            Zoom the section, and everything drawn in it, with a single
+            canvas scale. Text and image items only move, images created
+            from an ImagePyramid are swapped to the closest level once
+            the zooming pauses. Items created afterwards are not scaled.
+        :param factor: Scale factor, relative to the current zoom.
+        :param origin: Point of the section that stays in place.
+        """
+        originx, originy = self._absx + origin[0], self._absy + origin[1]
+        self._dest().scale(self.tag, originx, originy, factor, factor)
+        self._initx += (originx + (self._absx - originx) * factor) - self._absx
+        self._inity += (originy + (self._absy - originy) * factor) - self._absy
+        sections = [self]
+        while sections:
+            section = sections.pop()
+            section._absx = originx + (section._absx - originx) * factor
+            section._absy = originy + (section._absy - originy) * factor
+            section._width *= factor
+            section._height *= factor
+            section._zoom *= factor
+            if section is not self:
+                section._initx *= factor
+                section._inity *= factor
+            section._scaled(factor)
+            if section._children:
+                sections.extend(section._children)
+        if self._index is not None:
+            self._index.invalidate(self.tag)
+        if self._state.zoom is not None:
+            self._state.zoom.scale(self.tag, factor)
+
+    def _scaled(self, factor):
+        """
+            Called by scale on the section and each of its subsections,
+            after their position and size are scaled, so subclasses can
+            scale the geometry they keep themselves.
+        """
+
+    def animate_move(self, x, y, duration, easing=None, on_done=None):
+        """
+            Move the section, and everything drawn in it, by an offset
+            gradually, using the animator of the master canvas.
+        :param x: Offset on the x axis.
+        :param y: Offset on the y axis.
+        :param duration: Duration of the movement in seconds.
+        :param easing: Function mapping the time progress to the movement
+                       progress, both from 0 to 1.
+        :param on_done: Callback function to run when the movement ends.
+        :return: The running MoveAnimation.
+        """
+        return self.animator.start(MoveAnimation(self.tag, x, y, duration,
+                                                 easing, on_done, section=self))
+
+    @property
+    def animator(self) -> Animator:
+        return Animator.attach(self._canvas)
+
+    def relocate(self, x, y):
+        """
+            Place the section at new coordinates on its parent.
+        :param x: The new x on the parent from which the section starts.
+        :param y: The new y on the parent from which the section starts.
+        """
+        self.move_section(x - self._initx, y - self._inity)
 
     def itemcget(self, tagOrId, option):
-        return self.parent.itemcget(tagOrId, option)
+        scheduler = self._state.scheduler
+        if scheduler is not None:
+            value = scheduler.cget(tagOrId, option)
+            if value is not None:
+                return value
+        return self._query_dest().itemcget(tagOrId, option)
 
     def delete(self, tag):
         if tag == 'all' and self.tag is not None:
-            self.parent.delete(self.tag)
-        else:
-            self.parent.delete(tag)
+            tag = self.tag
+        self._dest().delete(tag)
+        if self._state.scheduler is not None:
+            self._state.scheduler.discard(tag)
+        if self._index is not None:
+            self._index.remove(tag)
+        if self._state.zoom is not None:
+            self._state.zoom.remove(tag)
+
+    def _require_index(self):
+        if self._index is None:
+            raise AttributeError('The section was not created with '
+                                 'spatial_index=True.')
+        return self._index
+
+    def items_in_rect(self, x1, y1, x2, y2, enclosed=False):
+        """
+            Get the items of the section overlapping a rectangle,
+            using the spatial index.
+        :param x1: Left of the rectangle in the coordinates of the section.
+        :param y1: Top of the rectangle in the coordinates of the section.
+        :param x2: Right of the rectangle in the coordinates of the section.
+        :param y2: Bottom of the rectangle in the coordinates of the section.
+        :param enclosed: Only get the items entirely inside the rectangle.
+        :return: List of item ids.
+        """
+        return self._require_index().items_in_rect(
+            self._absx + x1, self._absy + y1, self._absx + x2, self._absy + y2,
+            enclosed, tag=self.tag[0])
+
+    def items_at_point(self, x, y):
+        """
+            Get the items of the section whose bounding box contains a point,
+            using the spatial index.
+        :return: List of item ids.
+        """
+        return self._require_index().items_at_point(
+            self._absx + x, self._absy + y, tag=self.tag[0])
+
+    def nearest(self, x, y, max_distance=None):
+        """
+            Get the item of the section closest to a point,
+            using the spatial index.
+        :param max_distance: Ignore items further away than this.
+        :return: The item id, None if there is no such item.
+        """
+        return self._require_index().nearest(
+            self._absx + x, self._absy + y, max_distance, tag=self.tag[0])
 
     def find_withtag(self, tag):
         if self.tag is not None:
             tag = (tag, *self.tag)
-        return self.parent.find_withtag(tag)
+        return self._query_dest().find_withtag(tag)
 
     def tag_unbind(self, tagOrId, sequence, funcId=None):
-        self.parent.tag_unbind(tagOrId, sequence, funcId)
+        """
+            Remove the handlers of a sequence, only the one of funcId
+            when it is given.
+        """
+        dest = self._dest()
+        if funcId is None or not hasattr(self._canvas, 'tk'):
+            dest.tag_unbind(tagOrId, sequence, funcId)
+            return
+        # tkinter before 3.13 removes every handler of the sequence.
+        call = f'[{funcId} '
+        script = '\n'.join(line for line in
+                           str(dest.tag_bind(tagOrId, sequence)).split('\n')
+                           if line and call not in line)
+        if script:
+            self._dest().tag_bind(tagOrId, sequence, script)
+            self._canvas.deletecommand(funcId)
+        else:
+            self._dest().tag_unbind(tagOrId, sequence, funcId)
 
     def bind_all(self, event: str, func: Callable):
-        self.parent.bind_all(event, func)
+        self._canvas.bind_all(event, func)
 
     def absolute_coords(self, x, y):
-        if isinstance(self.parent, CanvasSection):
-            return self.parent.absolute_coords(x + self._initx,
-                                               y + self._inity)
-        return self._initx + x, self._inity + y
+        return self._absx + x, self._absy + y
 
     def itemconfigure(self, item, **kwargs):
-        self.parent.itemconfigure(item, **kwargs)
+        self.itemconfig(item, **kwargs)
 
     def update(self):
-        self.parent.update()
+        self._canvas.update()
 
     def update_idletasks(self):
-        self.parent.update_idletasks()
+        self._canvas.update_idletasks()
 
     def after(self, ms, func=None, *args):
         """
@@ -211,30 +691,46 @@ class CanvasSection:
         :param func: Callback function to run after the time passed.
         :param args: Extra arguments for the callback function.
         """
-        self.parent.after(ms, func, *args)
+        self._canvas.after(ms, func, *args)
 
     def master_canvas(self):
-        if isinstance(self.parent, CanvasSection):
-            return self.parent.master_canvas()
-        return self.parent
+        return self._canvas
 
     def mousescroll(self, event):
-        event.widget.event_generate('<<MouseWheel>>', x=event.x, y=event.y,
-                                    time=event.delta)
+        """
+            Forward wheel events to the items under the pointer as
+            <<MouseWheel>> events, merging the events of a frame into one
+            with the latest coordinates and the summed delta.
+        """
+        pending = _wheel_pending.get(event.widget)
+        if pending is None:
+            _wheel_pending[event.widget] = [event.x, event.y, event.delta]
+            event.widget.after(_WHEEL_MS, _flush_wheel, event.widget)
+        else:
+            pending[0], pending[1] = event.x, event.y
+            pending[2] += event.delta
 
     def destroy(self):
-        while len(self._events) > 0:
-            self.tag_unbind(self.tag, self._events.pop(0))
+        for throttle in self._throttles or ():
+            throttle.cancel()
+        for event in self._events or ():
+            self.tag_unbind(self.tag, event)
         self.delete('all')
-        attrs = list(self.__dict__.keys())
-        for attr in attrs:
-            delattr(self, attr)
+        if self._auto_tag:
+            self._state.tags.release(self.tag[0])
+        if isinstance(self.parent, CanvasSection) and self.parent._children:
+            self.parent._children.discard(self)
+        for attr in _slot_names(type(self)):
+            if hasattr(self, attr):
+                delattr(self, attr)
+        if hasattr(self, '__dict__'):
+            self.__dict__.clear()
 
 
 class CanvasButton:
-    image = None
-    text = None
-    cursored_img = None
+    __slots__ = ('_parent', '_delegator', 'image', 'text', 'cursored_img',
+                 'imgobj', 'cursored_imgobj', 'bound', 'value', '_bboxes',
+                 '_loads', '__weakref__')
 
     def __init__(self, parent, x, y, image=None, text=None, command=None,
                  tags=None, cursored_img=None, value=None):
@@ -256,14 +752,16 @@ class CanvasButton:
         :param cursored_img: Image to switch to on mouse-over.
         """
         self._parent = parent
+        self._delegator = getattr(parent, '_delegator', None)
+        self.image = self.text = self.cursored_img = None
+        self._bboxes = None
+        self._loads = ()
 
         if text is None and image is None:
             raise AttributeError('Either text or image have to be given.')
         if image is not None:
-            image = image.copy()
-            self.imgobj = image.pop('image')
-            self.image = parent.create_image(x, y, image=self.imgobj, **image,
-                                             tags=tags)
+            self.imgobj = image['image']
+            self.image = parent.create_image(x, y, **image, tags=tags)
         if text is not None:
             if 'textoffset' in text:
                 text = text.copy()
@@ -280,8 +778,8 @@ class CanvasButton:
             self.cursored_img = parent.create_image(x, y, image=cursored_img,
                                                     state=HIDDEN)
             if self.image is not None:
-                self._parent.tag_bind(self.image, '<Enter>', self._on_enter)
-            self._parent.tag_bind(self.cursored_img, '<Leave>', self._on_leave)
+                self._bind(self.image, '<Enter>', self._on_enter)
+            self._bind(self.cursored_img, '<Leave>', self._on_leave)
 
             self._click_listeners(self.cursored_img)
         else:
@@ -290,11 +788,18 @@ class CanvasButton:
         if value is not None:
             self.value = value
 
+    def _bind(self, element, sequence, func):
+        if self._delegator is not None:
+            self._delegator.register(element, sequence, func)
+        else:
+            self._parent.tag_bind(element, sequence, func)
+
     def _click_listeners(self, element):
-        self._parent.tag_bind(element, '<ButtonPress-1>', self._btnclick)
-        self._parent.tag_bind(element, '<ButtonRelease-1>', self._btnrelease)
+        self._bind(element, '<ButtonPress-1>', self._btnclick)
+        self._bind(element, '<ButtonRelease-1>', self._btnrelease)
 
     def _btnclick(self, event):
+        self._bboxes = None
         if self.image is not None:
             self._parent.move(self.image, 1, 1)
         if self.text is not None:
@@ -302,6 +807,7 @@ class CanvasButton:
 
     def _btnrelease(self, event):
         event.widget = self
+        self._bboxes = None
         if self.text is not None:
             self._parent.move(self.text, -1, -1)
         if self.image is not None:
@@ -331,6 +837,7 @@ class CanvasButton:
 
     def change_text(self, text):
         if self.text is not None:
+            self._bboxes = None
             self._parent.itemconfig(self.text, text=text)
 
     def get_text(self):
@@ -342,34 +849,115 @@ class CanvasButton:
         self.bound = func
 
     def _on_enter(self, event):
+        self._bboxes = None
         if self.image is not None:
             self._parent.itemconfig(self.image, state=HIDDEN)
         self._parent.itemconfig(self.cursored_img, state=NORMAL)
 
     def _on_leave(self, event):
+        self._bboxes = None
         self._parent.itemconfig(self.cursored_img, state=HIDDEN)
         if self.image is not None:
             self._parent.itemconfig(self.image, state=NORMAL)
 
     def update_cursored_img(self, new_img):
+        self._bboxes = None
         self._parent.itemconfig(self.cursored_img, image=new_img)
 
     def update_main_image(self, new_img):
         if self.image is not None:
+            self._bboxes = None
             self._parent.itemconfig(self.image, image=new_img)
 
+    def load_image(self, directory, w, h, cursored=False, relation=False,
+                   resample='antialias', loader=None):
+        """
+            Decode and resize an image file in the background, and show it
+            as the main image (or the cursored image) once it is ready.
+            The button keeps showing its current image until then, so it can
+            be created with a placeholder (see ImageLoader.placeholder).
+        :param directory: Path of the image file.
+        :param w: Width of the image.
+        :param h: Height of the image.
+        :param cursored: Replace the cursored image instead of the main one.
+        :param relation: Keep the height to width relation of the file.
+        :param resample: Resampling filter name.
+        :param loader: ImageLoader to use, the loader of the master canvas
+                       when None.
+        :return: The ImageRequest, cancelled if the button is deleted first.
+        """
+        if loader is None:
+            from .imageloader import ImageLoader
+            loader = ImageLoader.attach(self._canvas_offset()[0])
+        request = loader.load(w, h, directory,
+                              partial(self._image_loaded, cursored),
+                              relation, resample)
+        self._loads = [load for load in self._loads if not load.done]
+        if not request.done:
+            self._loads.append(request)
+        return request
+
+    def _image_loaded(self, cursored, img):
+        if cursored:
+            self.cursored_imgobj = img
+            self.update_cursored_img(img)
+        else:
+            self.imgobj = img
+            self.update_main_image(img)
+
+    def move(self, x, y):
+        """
+            Move all the items of the button.
+        :param x: Offset on the x axis.
+        :param y: Offset on the y axis.
+        """
+        for item in self._items():
+            self._parent.move(item, x, y)
+        if self._bboxes is not None:
+            *boxes, zoom = self._bboxes
+            self._bboxes = (*(None if box is None else
+                              (box[0] + x, box[1] + y, box[2] + x, box[3] + y)
+                              for box in boxes), zoom)
+
     def delete(self):
         """
             Delete the CanvasButton from the parent.
         """
-        if self.image is not None:
-            self._parent.delete(self.image)
-        if self.text is not None:
-            self._parent.delete(self.text)
-        if self.cursored_img is not None:
-            self._parent.delete(self.cursored_img)
+        for load in self._loads:
+            load.cancel()
+        for item in self._items():
+            if self._delegator is not None:
+                self._delegator.unregister(item)
+            self._parent.delete(item)
+        self._bboxes = None
+
+    def _items(self):
+        return [item for item in (self.image, self.text, self.cursored_img)
+                if item is not None]
 
     def _get_bboxes(self):
+        """
+            Bounding boxes of the visible image and of the text,
+            cached until the button changes or its section is scaled.
+        """
+        bboxes = self._cached_bboxes()
+        if bboxes is None:
+            bboxes = self._bboxes = (*self._query_bboxes(),
+                                     getattr(self._parent, '_zoom', 1.0))
+        return bboxes[:2]
+
+    def _cached_bboxes(self):
+        """
+            The cached boxes, None when there are none or they were
+            measured at another zoom of the section.
+        """
+        bboxes = self._bboxes
+        if bboxes is not None and bboxes[2] == getattr(self._parent, '_zoom',
+                                                       1.0):
+            return bboxes
+        return None
+
+    def _query_bboxes(self):
         img_box, txt_box = None, None
         if (self.image is not None and
                 self._parent.itemcget(self.image, 'state') in ('', NORMAL)):
@@ -383,6 +971,33 @@ class CanvasButton:
 
         return img_box, txt_box
 
+    def _canvas_offset(self):
+        """
+            The master canvas of the button and the offset of its parent.
+        """
+        parent = self._parent
+        if isinstance(parent, CanvasSection):
+            return parent._canvas, parent._absx, parent._absy
+        return parent, 0, 0
+
+    def _set_bboxes(self, answers):
+        """
+            Fill the geometry cache from queried item states and bboxes.
+        :param answers: (state, absolute bbox) pairs, or None for missing
+                        items, of the image, cursored image and text.
+        """
+        _, offx, offy = self._canvas_offset()
+
+        def visible_box(answer):
+            if answer is None or answer[0] not in ('', NORMAL) or not answer[1]:
+                return None
+            box = answer[1]
+            return box[0] - offx, box[1] - offy, box[2] - offx, box[3] - offy
+
+        img_box = visible_box(answers[0]) or visible_box(answers[1])
+        self._bboxes = (img_box, visible_box(answers[2]),
+                        getattr(self._parent, '_zoom', 1.0))
+
     @property
     def height(self):
         img_box, txt_box = self._get_bboxes()
@@ -408,25 +1023,17 @@ class CanvasButton:
 
 
 class SimpleCanvasCheckbox(CanvasSection):
+    __slots__ = ('default', 'colors', 'font', 'check', 'enabled')
+
     def __init__(self, parent, x, y, width, height, default=False, tag=None,
                  colors: dict = None, font=None, extra_txt=''):
         super().__init__(parent, x, y, width, height, tag=tag)
         self.default = default
-        if colors is not None:
-            self.colors = colors
-            if 'font' not in self.colors:
-                self.colors['font'] = 'black'
-            if 'background' not in self.colors:
-                self.colors['background'] = 'black'
-            if 'check' not in self.colors:
-                self.colors['check'] = 'white'
-        else:
-            self.colors = {'font': 'black', 'background': 'black',
-                           'check': 'white'}
+        self.colors = _shared_style(_CHECKBOX_COLORS, colors)
         if font is None:
-            font = Font()
-        self.font = font
-        _fit_font_height(self.font, height)
+            self.font = font_registry.acquire(height)
+        else:
+            self.font = font_registry.acquire_like(font, height)
         self.create_rectangle(0, 0, height, height, outline='',
                               fill=self.colors['background'])
         self.create_text(height*1.2, height/2, text=extra_txt, font=self.font,
@@ -467,3 +1074,202 @@ class SimpleCanvasCheckbox(CanvasSection):
     def show(self):
         self.itemconfig(self.tag, state=NORMAL)
         self.itemconfig(self.check, state=NORMAL if self.default else HIDDEN)
+
+    def destroy(self):
+        font_registry.release(self.font)
+        super().destroy()
+
+
+class CanvasCheckboxGroup(CanvasSection):
+    __slots__ = ('colors', 'font', 'command', 'enabled', 'columns',
+                 'cell_width', 'cell_height', '_values', '_checks')
+
+    def __init__(self, parent, x, y, width, height, labels, columns=1,
+                 default=False, tag=None, colors: dict = None, font=None,
+                 command: Callable = None):
+        """
+            Many checkboxes laid out in a grid in one section.
+            The values are kept in an array, so reading them does not ask
+            the canvas, and clicks are handled by a single section binding.
+        :param width: The width of the group.
+        :param height: The height of the group, split between the rows.
+        :param labels: Texts of the checkboxes, one per checkbox.
+        :param columns: Amount of checkboxes in a row.
+        :param default: Initial value of all the checkboxes.
+        :param colors: Dictionary with 'font', 'background' and 'check' colors.
+        :param command: Callback function run with the index and the new value
+                        of a checkbox after it was clicked.
+        """
+        super().__init__(parent, x, y, width, height, tag=tag)
+        self.colors = _shared_style(_CHECKBOX_COLORS, colors)
+        self.command = command
+        self.enabled = True
+        self.columns = columns
+        labels = list(labels)
+        rows = max(-(-len(labels) // columns), 1)
+        self.cell_width = width / columns
+        self.cell_height = height / rows
+        box = self.cell_height * 0.8
+        if font is None:
+            self.font = font_registry.acquire(box)
+        else:
+            self.font = font_registry.acquire_like(font, box)
+        self._values = array('b', [bool(default)]) * len(labels)
+        self._checks = []
+        state = NORMAL if default else HIDDEN
+        with self.batch():
+            for index, label in enumerate(labels):
+                left = index % columns * self.cell_width
+                top = index // columns * self.cell_height
+                self.create_rectangle(left, top, left + box, top + box,
+                                      outline='',
+                                      fill=self.colors['background'])
+                self.create_text(left + box * 1.2, top + box / 2, text=label,
+                                 font=self.font, fill=self.colors['font'],
+                                 anchor=W)
+                self._checks.append(self.create_rectangle(
+                    left + box / 3, top + box / 3,
+                    left + box * (2 / 3), top + box * (2 / 3),
+                    fill=self.colors['check'], outline='', state=state))
+        self.bind_section('<ButtonRelease-1>', self._mouseclick)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [bool(value) for value in self._values[index]]
+        return bool(self._values[index])
+
+    def __setitem__(self, index, value: bool):
+        self._apply({self._position(index): value})
+
+    def _position(self, index):
+        if index < 0:
+            index += len(self._values)
+        if not 0 <= index < len(self._values):
+            raise IndexError('checkbox index out of range')
+        return index
+
+    def _scaled(self, factor):
+        self.cell_width *= factor
+        self.cell_height *= factor
+
+    def _index_at(self, event):
+        canvas = self._canvas
+        x = canvas.canvasx(event.x) if hasattr(canvas, 'canvasx') else event.x
+        y = canvas.canvasy(event.y) if hasattr(canvas, 'canvasy') else event.y
+        column = int((x - self._absx) // self.cell_width)
+        index = int((y - self._absy) // self.cell_height) * self.columns + column
+        if 0 <= column < self.columns and 0 <= index < len(self._values):
+            return index
+
+    def _mouseclick(self, event):
+        if self.enabled:
+            index = self._index_at(event)
+            if index is not None:
+                value = not self._values[index]
+                self._apply({index: value})
+                if self.command is not None:
+                    self.command(index, value)
+        return 'break'
+
+    def _apply(self, values):
+        """
+            Set the values of checkboxes, configuring only the check items
+            whose value changed, as one batch.
+        :param values: Dictionary of index to new value.
+        """
+        current = self._values
+        changed = [(index, bool(value)) for index, value in values.items()
+                   if current[index] != bool(value)]
+        if not changed:
+            return
+        with self.batch():
+            for index, value in changed:
+                current[index] = value
+                self.itemconfig(self._checks[index],
+                                state=NORMAL if value else HIDDEN)
+
+    def set_enable_disable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def get_all(self) -> array:
+        """
+            Get the values of all the checkboxes.
+        :return: Copy of the value array, 1 for checked and 0 otherwise.
+        """
+        return array('b', self._values)
+
+    def set_all(self, mask):
+        """
+            Set the values of all the checkboxes.
+        :param mask: Sequence of values, one per checkbox,
+                     or a single bool for all of them.
+        """
+        if isinstance(mask, bool):
+            mask = (mask, ) * len(self._values)
+        elif len(mask) != len(self._values):
+            raise ValueError(f'Expected {len(self._values)} values, '
+                             f'got {len(mask)}.')
+        self._apply(dict(enumerate(mask)))
+
+    def toggle(self, indices):
+        """
+            Invert the values of some checkboxes.
+        :param indices: Iterable of checkbox indices.
+        """
+        values = self._values
+        changes = {}
+        for index in indices:
+            # Normalized, so -1 and the last index toggle the same box.
+            index = self._position(index)
+            changes[index] = not changes.get(index, values[index])
+        self._apply(changes)
+
+    def destroy(self):
+        font_registry.release(self.font)
+        super().destroy()
+
+
+def measure_buttons(buttons):
+    """
+        Get the width and height of many buttons in one pass.
+        The geometry of buttons that are not cached yet is queried with a
+        single Tcl script per canvas, and stays cached on the buttons.
+    :param buttons: Iterable of CanvasButtons.
+    :return: List of (width, height) tuples.
+    """
+    buttons = list(buttons)
+    groups = {}
+    for button in buttons:
+        if button._cached_bboxes() is None:
+            canvas = button._canvas_offset()[0]
+            if hasattr(canvas, 'tk') and hasattr(canvas, '_w'):
+                groups.setdefault(canvas, []).append(button)
+    for canvas, group in groups.items():
+        state = _canvas_state(canvas)
+        if state.scheduler is not None and state.scheduler._pending:
+            state.scheduler.flush()
+        if state.batch is not None:
+            state.batch.flush()
+        path = _tcl_quote(canvas._w)
+        script = ['list']
+        for button in group:
+            for item in (button.image, button.cursored_img, button.text):
+                if item is None:
+                    script.append(' {}')
+                else:
+                    item = _tcl_quote(item)
+                    script.append(f' [list [{path} itemcget {item} -state]'
+                                  f' [{path} bbox {item}]]')
+        splitlist = canvas.tk.splitlist
+        answers = []
+        for answer in splitlist(canvas.tk.eval(''.join(script))):
+            if answer:
+                state, box = splitlist(answer)
+                answer = str(state), tuple(int(val) for val in splitlist(box))
+            answers.append(answer or None)
+        for index, button in enumerate(group):
+            button._set_bboxes(answers[index * 3:index * 3 + 3])
+    return [(button.width, button.height) for button in buttons]
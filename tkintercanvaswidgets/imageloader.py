@@ -0,0 +1,214 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable
+
+from PIL import Image, ImageTk
+
+from ._helpers import _canvas_state, _image_key, _prepare_image, image_cache
+
+
+class ImageRequest:
+    """
+        A pending background image load.
+    """
+    __slots__ = ('args', 'key', 'callback', 'on_error', 'future', 'done',
+                 'cancelled', 'error', '_loader')
+
+    def __init__(self, args, key, callback, on_error=None, loader=None):
+        self.args = args
+        self.key = key
+        self.callback = callback
+        self.on_error = on_error
+        self.future = None
+        self.done = False
+        self.cancelled = False
+        self.error = None
+        self._loader = loader
+
+    def cancel(self):
+        """
+            Stop the load, the callback will not be called. The decode is
+            cancelled too if no other request shares it and it did not
+            start yet.
+        """
+        if not self.done:
+            self.cancelled = self.done = True
+            if self._loader is not None and self.future is not None:
+                self._loader._release(self.future)
+
+
+class ImageLoader:
+    """
+        Decodes and resizes image files in a thread pool.
+        Requests for the same file and size share a single decode.
+        The Tk images are created on the Tk thread, by polling the finished
+        loads with after, and handed to the callbacks of the requests.
+    """
+
+    def __init__(self, canvas, workers=4, max_queue=16, max_waiting=256,
+                 poll_ms=15):
+        """
+            Constructor for an ImageLoader, use attach to share it between
+            the widgets of a canvas.
+        :param canvas: Widget used to schedule the polling.
+        :param workers: Amount of worker threads.
+        :param max_queue: Maximal amount of decodes handed to the workers at
+                          once, later requests wait until there is room.
+        :param max_waiting: Maximal amount of waiting requests, the oldest
+                            ones are cancelled when more requests come.
+        :param poll_ms: Milliseconds between checks for finished loads.
+        """
+        self.canvas = canvas
+        self.max_queue = max_queue
+        self.max_waiting = max_waiting
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(workers,
+                                            thread_name_prefix='image-loader')
+        self._waiting = deque()
+        self._running = []
+        self._futures = {}
+        self._active = set()
+        self._after_id = None
+        self._placeholders = {}
+
+    @classmethod
+    def attach(cls, canvas, **kwargs):
+        """
+            Get the image loader of a canvas, creating it if needed.
+        :param canvas: The master canvas or a section on it.
+        :param kwargs: Arguments for the constructor of a new loader.
+        """
+        if hasattr(canvas, 'master_canvas'):
+            canvas = canvas.master_canvas()
+        state = _canvas_state(canvas)
+        if state.loader is None:
+            state.loader = cls(canvas, **kwargs)
+        return state.loader
+
+    @property
+    def pending(self):
+        return len(self._waiting) + len(self._running)
+
+    def load(self, w, h, directory, callback: Callable, relation=False,
+             resample='antialias', on_error: Callable = None) -> ImageRequest:
+        """
+            Load an image file in the background, the same way as _get_image.
+        :param callback: Called with the Tk image once it is ready, at once
+                         if the image is already cached.
+        :param on_error: Called with the exception if the load fails.
+        :return: The ImageRequest of the load.
+        """
+        key = _image_key(w, h, directory, relation, resample)
+        request = ImageRequest((w, h, directory, relation, resample, key),
+                               key, callback, on_error, self)
+        cached = image_cache.get(key) if key is not None else None
+        if cached is not None:
+            request.done = True
+            callback(cached)
+            return request
+        self._waiting.append(request)
+        self._submit()
+        # The oldest requests are the most likely to be scrolled away.
+        while len(self._waiting) > self.max_waiting:
+            self._waiting.popleft().cancel()
+        return request
+
+    def placeholder(self, w, h, color=(0, 0, 0, 0)):
+        """
+            Get a plain Tk image to show until the real image is loaded.
+        :param color: RGBA color of the image.
+        """
+        key = (int(w), int(h), color)
+        img = self._placeholders.get(key)
+        if img is None:
+            img = self._placeholders[key] = ImageTk.PhotoImage(
+                Image.new('RGBA', key[:2], color))
+        return img
+
+    def cancel_all(self):
+        for request in (*self._waiting, *self._running):
+            request.cancelled = request.done = True
+        self._waiting.clear()
+        self._running.clear()
+        for future in self._active:
+            future.cancel()
+
+    def shutdown(self):
+        """
+            Cancel all the loads and stop the worker threads.
+        """
+        self.cancel_all()
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+            self._after_id = None
+        self._executor.shutdown(wait=False)
+
+    def _release(self, future):
+        """
+            Cancel a decode once no running request waits for it.
+        """
+        if any(request.future is future and not request.cancelled
+               for request in self._running):
+            return
+        if future.cancel():
+            self._active.discard(future)
+            for key in [key for key, other in self._futures.items()
+                        if other is future]:
+                del self._futures[key]
+            self._submit()
+
+    def _submit(self):
+        while self._waiting:
+            request = self._waiting[0]
+            if request.cancelled:
+                self._waiting.popleft()
+                continue
+            future = self._futures.get(request.key)
+            if future is None:
+                if len(self._active) >= self.max_queue:
+                    break
+                future = self._executor.submit(_prepare_image, *request.args)
+                self._active.add(future)
+                if request.key is not None:
+                    self._futures[request.key] = future
+            self._waiting.popleft()
+            request.future = future
+            self._running.append(request)
+        if (self._running or self._active) and self._after_id is None:
+            self._after_id = self.canvas.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._after_id = None
+        running = []
+        finished = []
+        for request in self._running:
+            if request.cancelled:
+                continue
+            if request.future.done():
+                finished.append(request)
+            else:
+                running.append(request)
+        self._running = running
+        for future in [future for future in self._active if future.done()]:
+            self._active.discard(future)
+        for key in [key for key, future in self._futures.items()
+                    if future.done()]:
+            del self._futures[key]
+        images = {}
+        for request in finished:
+            request.done = True
+            try:
+                resized = request.future.result()
+            except Exception as error:
+                request.error = error
+                if request.on_error is not None:
+                    request.on_error(error)
+                continue
+            img = images.get(request.future)
+            if img is None:
+                img = images[request.future] = ImageTk.PhotoImage(resized)
+                if request.key is not None:
+                    image_cache.put(request.key, img,
+                                    resized.width * resized.height * 4)
+            request.callback(img)
+        self._submit()
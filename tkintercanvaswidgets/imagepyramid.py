@@ -0,0 +1,147 @@
+from math import log
+
+from ._batch import BatchItem, _CanvasBatch
+from ._helpers import _canvas_state, _load_source, _resize_image, _source_key
+
+
+class ImagePyramid:
+    """
+        An image resized once to several zoom levels, so zooming only
+        swaps between ready images instead of resampling the file.
+        Levels above 1 are resized from the source, smaller ones each
+        from the next larger one.
+    """
+
+    def __init__(self, source, w=None, h=None,
+                 levels=(0.125, 0.25, 0.5, 1.0, 2.0), resample='antialias'):
+        """
+            Constructor for an ImagePyramid
+        :param source: Path of the image file or a PIL image.
+        :param w: Width of the image at zoom 1, the source width when None.
+        :param h: Height of the image at zoom 1, the source height when None.
+        :param levels: Zoom factors for which the image is prepared.
+        :param resample: Resampling filter name.
+        """
+        from PIL import Image
+        if isinstance(source, Image.Image):
+            img = source.convert('RGBA')
+        else:
+            img = _load_source(source, _source_key(source))
+        w = img.width if w is None else w
+        h = img.height if h is None else h
+        self.levels = tuple(sorted(levels))
+        self._images = {}
+        self._tk_images = {}
+        source = base = img
+        for level in reversed(self.levels):
+            size = (max(int(w * level), 1), max(int(h * level), 1))
+            # Enlarged levels would blur the smaller ones resized from them.
+            img = source if level >= 1 else base
+            if img.size != size:
+                img = _resize_image(*size, img, False, resample=resample)
+            self._images[level] = img
+            if level <= 1:
+                base = img
+
+    def level_for(self, zoom):
+        """
+            Get the level closest to a zoom factor.
+        """
+        if zoom <= 0:
+            return self.levels[0]
+        return min(self.levels, key=lambda level: abs(log(level / zoom)))
+
+    def image(self, zoom=1.0, convert=True):
+        """
+            Get the image of the level closest to a zoom factor.
+        :param convert: Return a Tk image (created once per level),
+                        the PIL image otherwise.
+        """
+        level = self.level_for(zoom)
+        if not convert:
+            return self._images[level]
+        img = self._tk_images.get(level)
+        if img is None:
+            from PIL import ImageTk
+            img = self._tk_images[level] = ImageTk.PhotoImage(
+                self._images[level])
+        return img
+
+
+class _ZoomedImages:
+    """
+        Image items showing an ImagePyramid on a canvas. After the items
+        are scaled, their images are swapped to the closest level once no
+        scale happened for the debounce time.
+    """
+
+    def __init__(self, canvas, debounce_ms=120):
+        self.canvas = canvas
+        self.debounce_ms = debounce_ms
+        self._items = {}
+        self._after_id = None
+
+    @classmethod
+    def attach(cls, canvas):
+        state = _canvas_state(canvas)
+        if state.zoom is None:
+            state.zoom = cls(canvas)
+        return state.zoom
+
+    def add(self, item, pyramid, zoom, tags):
+        """
+            Register a new image item.
+        :param zoom: The zoom the item is shown at.
+        :param tags: Tags of the item.
+        """
+        self._items[item] = [pyramid, zoom, pyramid.level_for(zoom),
+                             frozenset(tags)]
+
+    def _matching(self, tagOrId):
+        if isinstance(tagOrId, (int, BatchItem)) or (
+                isinstance(tagOrId, str) and tagOrId.isdigit()):
+            item = int(tagOrId)
+            return [key for key in self._items
+                    if key is tagOrId or getattr(key, 'id', key) == item]
+        tags = set(tagOrId) if isinstance(tagOrId, tuple) else {tagOrId}
+        if 'all' in tags:
+            return list(self._items)
+        return [key for key, entry in self._items.items() if tags <= entry[3]]
+
+    def scale(self, tagOrId, factor):
+        """
+            Follow the scale of the matching items and schedule the swap.
+        """
+        for key in self._matching(tagOrId):
+            self._items[key][1] *= factor
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+        self._after_id = self.canvas.after(self.debounce_ms, self.swap)
+
+    def remove(self, tagOrId):
+        for key in self._matching(tagOrId):
+            del self._items[key]
+
+    def swap(self):
+        """
+            Show the closest pyramid level on every item whose zoom
+            moved to another level.
+        """
+        self._after_id = None
+        convert = hasattr(self.canvas, 'tk')
+        changes = []
+        for key, entry in self._items.items():
+            pyramid, zoom, level, _ = entry
+            closest = pyramid.level_for(zoom)
+            if closest != level:
+                entry[2] = closest
+                changes.append((key, pyramid.image(closest, convert)))
+        if not changes:
+            return
+        dest = _canvas_state(self.canvas).batch
+        if dest is None and convert:
+            dest = _CanvasBatch(self.canvas)
+        for key, img in changes:
+            (dest or self.canvas).itemconfig(key, image=img)
+        if isinstance(dest, _CanvasBatch) and dest.depth == 0:
+            dest.flush()
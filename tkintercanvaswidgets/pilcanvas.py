@@ -0,0 +1,510 @@
+import re
+import time
+from itertools import count
+from tkinter import HIDDEN
+
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+_DEFAULTS = {
+    'rectangle': {'fill': '', 'outline': 'black', 'width': 1},
+    'oval': {'fill': '', 'outline': 'black', 'width': 1},
+    'arc': {'fill': '', 'outline': 'black', 'width': 1, 'start': 0,
+            'extent': 90, 'style': 'pieslice'},
+    'line': {'fill': 'black', 'width': 1},
+    'text': {'fill': 'black', 'text': '', 'font': None, 'anchor': 'center',
+             'justify': 'left', 'width': 0},
+    'image': {'image': None, 'anchor': 'center'},
+}
+_GRAY = re.compile(r'gr[ae]y(\d{1,3})$')
+_measure_draw = ImageDraw.Draw(Image.new('1', (1, 1)))
+_pil_fonts = {}
+
+
+def _color(value):
+    """
+        Convert a Tk color to an RGB tuple, None for no (or unknown) color.
+    """
+    if not value:
+        return None
+    try:
+        return ImageColor.getrgb(value)
+    except ValueError:
+        gray = _GRAY.match(value.lower())
+        if gray is not None:
+            level = round(min(int(gray.group(1)), 100) * 2.55)
+            return level, level, level
+        return None
+
+
+def _pil_font(font):
+    """
+        Get the PIL font matching a Tk font description: a Font object,
+        a (family, size, style...) tuple or a 'family size style' string.
+    """
+    if font is None:
+        family, size, bold = None, 9, False
+    elif hasattr(font, 'actual'):
+        actual = font.actual()
+        family, size = actual['family'], int(actual['size'])
+        bold = actual['weight'] == 'bold'
+    else:
+        parts = font.split() if isinstance(font, str) else list(font)
+        family = parts[0] if parts else None
+        size = int(parts[1]) if len(parts) > 1 else 9
+        bold = 'bold' in parts[2:]
+    # Negative Tk sizes are pixels, positive ones are points.
+    pixels = -size if size < 0 else round(size * 96 / 72)
+    key = (family, pixels, bold)
+    pil_font = _pil_fonts.get(key)
+    if pil_font is None:
+        names = []
+        if family:
+            names.append(family.replace(' ', '') + ('-Bold' if bold else ''))
+            names.append(family.replace(' ', ''))
+        names.append('DejaVuSans-Bold' if bold else 'DejaVuSans')
+        for name in names:
+            try:
+                pil_font = ImageFont.truetype(f'{name}.ttf', pixels)
+                break
+            except OSError:
+                continue
+        else:
+            try:
+                pil_font = ImageFont.load_default(pixels)
+            except TypeError:
+                # Pillow before 10.1 only has the fixed size bitmap font.
+                pil_font = ImageFont.load_default()
+        _pil_fonts[key] = pil_font
+    return pil_font
+
+
+def _text_width(font, text):
+    getlength = getattr(font, 'getlength', None)
+    if getlength is None:
+        # The bitmap font of Pillow before 9.2 only has getsize.
+        return font.getsize(text)[0]
+    return getlength(text)
+
+
+def _text_size(font, text):
+    """
+        Get the width and height of a multiline text.
+    """
+    try:
+        box = _measure_draw.multiline_textbbox((0, 0), text, font=font)
+    except ValueError:
+        # Before Pillow 9.2 only TrueType fonts have text bboxes, lines of
+        # the bitmap font are measured the way multiline_text spaces them.
+        lines = text.split('\n')
+        widths = [font.getsize(line)[0] for line in lines]
+        spacing = font.getsize('A')[1] + 4
+        return (max(widths),
+                spacing * (len(lines) - 1) + font.getsize(lines[-1])[1])
+    return box[2], box[3]
+
+
+def _image_size(image):
+    size = getattr(image, 'size', None)
+    if isinstance(size, tuple):
+        return size
+    return image.width(), image.height()
+
+
+def _anchor_origin(x, y, width, height, anchor):
+    anchor = str(anchor)
+    if anchor == 'center':
+        return x - width / 2, y - height / 2
+    if 'w' in anchor:
+        left = x
+    elif 'e' in anchor:
+        left = x - width
+    else:
+        left = x - width / 2
+    if anchor.startswith('n'):
+        top = y
+    elif anchor.startswith('s'):
+        top = y - height
+    else:
+        top = y - height / 2
+    return left, top
+
+
+class _Item:
+    __slots__ = ('kind', 'coords', 'options', 'tags')
+
+    def __init__(self, kind, coords, options, tags):
+        self.kind = kind
+        self.coords = coords
+        self.options = options
+        self.tags = tags
+
+
+class PILCanvas:
+    """
+        Canvas without Tk, keeping the items in Python and drawing them on
+        a PIL image. It implements the canvas methods used by CanvasSection
+        and CanvasButton, so layouts can be built, measured and rendered
+        without a display, for example in worker processes.
+        Event bindings are stored but never fired. Images must be PIL images
+        to be drawn, and the text width option wraps on spaces.
+    """
+
+    def __init__(self, width, height, background='white'):
+        """
+            Constructor for a PILCanvas
+        :param width: Width of the rendered image.
+        :param height: Height of the rendered image.
+        :param background: Background color of the rendered image.
+        """
+        self.width = width
+        self.height = height
+        self.background = background
+        self._items = {}
+        self._ids = count(1)
+        self._bindings = {}
+        self._after = {}
+        self._after_ids = count(1)
+
+    # Items
+
+    def _create(self, kind, coords, kwargs):
+        if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+            coords = coords[0]
+        options = dict(_DEFAULTS[kind])
+        tags = kwargs.pop('tags', None)
+        options['state'] = ''
+        options.update(kwargs)
+        item = next(self._ids)
+        self._items[item] = _Item(kind, [float(val) for val in coords], options,
+                                  self._tag_tuple(tags))
+        return item
+
+    @staticmethod
+    def _tag_tuple(tags):
+        if tags is None:
+            return ()
+        if isinstance(tags, str):
+            return tuple(tags.split())
+        return tuple(str(tag) for tag in tags)
+
+    def create_rectangle(self, *coords, **kwargs):
+        return self._create('rectangle', coords, kwargs)
+
+    def create_oval(self, *coords, **kwargs):
+        return self._create('oval', coords, kwargs)
+
+    def create_arc(self, *coords, **kwargs):
+        return self._create('arc', coords, kwargs)
+
+    def create_line(self, *coords, **kwargs):
+        return self._create('line', coords, kwargs)
+
+    def create_text(self, *coords, **kwargs):
+        return self._create('text', coords, kwargs)
+
+    def create_image(self, *coords, **kwargs):
+        return self._create('image', coords, kwargs)
+
+    def _find(self, tagOrId):
+        """
+            Ids of the items matching an id, a tag, or a tuple of tags that
+            must all be present, in stacking order.
+        """
+        if isinstance(tagOrId, int) or (isinstance(tagOrId, str) and
+                                        tagOrId.isdigit()):
+            item = int(tagOrId)
+            return [item] if item in self._items else []
+        if isinstance(tagOrId, (tuple, list)):
+            tags = [str(tag) for tag in tagOrId]
+        else:
+            tags = [str(tagOrId)]
+        if tags == ['all']:
+            return list(self._items)
+        return [item for item, data in self._items.items()
+                if all(tag in data.tags for tag in tags)]
+
+    def find_withtag(self, tagOrId):
+        return tuple(self._find(tagOrId))
+
+    def find_all(self):
+        return tuple(self._items)
+
+    def gettags(self, tagOrId):
+        found = self._find(tagOrId)
+        return self._items[found[0]].tags if found else ()
+
+    def itemconfig(self, tagOrId, cnf=None, **kwargs):
+        if cnf:
+            kwargs = {**cnf, **kwargs}
+        for item in self._find(tagOrId):
+            data = self._items[item]
+            options = dict(kwargs)
+            if 'tags' in options:
+                data.tags = self._tag_tuple(options.pop('tags'))
+            data.options.update(options)
+
+    itemconfigure = itemconfig
+
+    def itemcget(self, tagOrId, option):
+        found = self._find(tagOrId)
+        if not found:
+            return ''
+        data = self._items[found[0]]
+        if option == 'tags':
+            return ' '.join(data.tags)
+        return data.options.get(option, '')
+
+    def coords(self, tagOrId, *args):
+        found = self._find(tagOrId)
+        if not found:
+            return []
+        data = self._items[found[0]]
+        if not args:
+            return list(data.coords)
+        if len(args) == 1 and isinstance(args[0], (list, tuple)):
+            args = args[0]
+        data.coords = [float(val) for val in args]
+
+    def move(self, tagOrId, x, y):
+        for item in self._find(tagOrId):
+            coords = self._items[item].coords
+            for index in range(0, len(coords), 2):
+                coords[index] += x
+                coords[index + 1] += y
+
+    def scale(self, tagOrId, xOrigin, yOrigin, xScale, yScale):
+        for item in self._find(tagOrId):
+            coords = self._items[item].coords
+            for index in range(0, len(coords), 2):
+                coords[index] = xOrigin + (coords[index] - xOrigin) * xScale
+                coords[index + 1] = (yOrigin +
+                                     (coords[index + 1] - yOrigin) * yScale)
+
+    def delete(self, *tagsOrIds):
+        for tagOrId in tagsOrIds:
+            for item in self._find(tagOrId):
+                del self._items[item]
+
+    def tag_raise(self, tagOrId, aboveThis=None):
+        self._restack(tagOrId, aboveThis, above=True)
+
+    def tag_lower(self, tagOrId, belowThis=None):
+        self._restack(tagOrId, belowThis, above=False)
+
+    lift = tag_raise
+    lower = tag_lower
+
+    def _restack(self, tagOrId, reference, above):
+        moved = self._find(tagOrId)
+        if not moved:
+            return
+        items = self._items
+        skipped = set(moved)
+        order = [item for item in items if item not in skipped]
+        if reference is None:
+            position = len(order) if above else 0
+        else:
+            references = set(self._find(reference)) - skipped
+            positions = [index for index, item in enumerate(order)
+                         if item in references]
+            if not positions:
+                return
+            position = positions[-1] + 1 if above else positions[0]
+        order[position:position] = moved
+        self._items = {item: items[item] for item in order}
+
+    # Geometry
+
+    def _item_bbox(self, data):
+        if data.options.get('state') == HIDDEN:
+            return None
+        coords = data.coords
+        if data.kind == 'text':
+            text = self._wrapped_text(data)
+            if not text:
+                return None
+            width, height = _text_size(_pil_font(data.options['font']), text)
+            left, top = _anchor_origin(coords[0], coords[1], width, height,
+                                       data.options['anchor'])
+            return (int(left), int(top), int(left + width) + 1,
+                    int(top + height) + 1)
+        if data.kind == 'image':
+            image = data.options['image']
+            if image is None:
+                return None
+            width, height = _image_size(image)
+            left, top = _anchor_origin(coords[0], coords[1], width, height,
+                                       data.options['anchor'])
+            return int(left), int(top), int(left + width), int(top + height)
+        half = float(data.options.get('width') or 0) / 2
+        xs, ys = coords[0::2], coords[1::2]
+        return (int(min(xs) - half - 0.5), int(min(ys) - half - 0.5),
+                int(max(xs) + half + 1.5), int(max(ys) + half + 1.5))
+
+    def _wrapped_text(self, data):
+        text = str(data.options['text'])
+        width = float(data.options.get('width') or 0)
+        if width <= 0:
+            return text
+        font = _pil_font(data.options['font'])
+        lines = []
+        for paragraph in text.split('\n'):
+            line = ''
+            for word in paragraph.split(' '):
+                candidate = f'{line} {word}' if line else word
+                if line and _text_width(font, candidate) > width:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = candidate
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def bbox(self, *tagsOrIds):
+        boxes = [box for tagOrId in tagsOrIds for item in self._find(tagOrId)
+                 for box in (self._item_bbox(self._items[item]), )
+                 if box is not None]
+        if not boxes:
+            return None
+        return (min(box[0] for box in boxes), min(box[1] for box in boxes),
+                max(box[2] for box in boxes), max(box[3] for box in boxes))
+
+    def find_overlapping(self, x1, y1, x2, y2):
+        return tuple(item for item, data in self._items.items()
+                     for box in (self._item_bbox(data), )
+                     if box is not None and box[0] <= x2 and x1 <= box[2] and
+                     box[1] <= y2 and y1 <= box[3])
+
+    def find_enclosed(self, x1, y1, x2, y2):
+        return tuple(item for item, data in self._items.items()
+                     for box in (self._item_bbox(data), )
+                     if box is not None and x1 <= box[0] and box[2] <= x2 and
+                     y1 <= box[1] and box[3] <= y2)
+
+    def canvasx(self, screenx, gridspacing=None):
+        return float(screenx)
+
+    def canvasy(self, screeny, gridspacing=None):
+        return float(screeny)
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def winfo_rgb(self, color):
+        return tuple(val * 257 for val in _color(color) or (0, 0, 0))
+
+    # Events and timers
+
+    def tag_bind(self, tagOrId, sequence=None, func=None, add=None):
+        handlers = self._bindings.setdefault((str(tagOrId), sequence), [])
+        if not add:
+            handlers.clear()
+        handlers.append(func)
+        return str(id(func))
+
+    def tag_unbind(self, tagOrId, sequence, funcid=None):
+        key = (str(tagOrId), sequence)
+        if funcid is None:
+            self._bindings.pop(key, None)
+        elif key in self._bindings:
+            self._bindings[key] = [func for func in self._bindings[key]
+                                   if str(id(func)) != funcid]
+
+    def bind(self, sequence=None, func=None, add=None):
+        return self.tag_bind('', sequence, func, add)
+
+    bind_all = bind
+
+    def after(self, ms, func=None, *args):
+        after_id = f'after#{next(self._after_ids)}'
+        self._after[after_id] = (time.perf_counter() + ms / 1000, func, args)
+        return after_id
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, after_id):
+        self._after.pop(after_id, None)
+
+    def update(self):
+        """
+            Run the after callbacks that are due.
+        """
+        now = time.perf_counter()
+        for after_id, (due, func, args) in sorted(self._after.items(),
+                                                  key=lambda entry: entry[1][0]):
+            if due <= now and self._after.pop(after_id, None) is not None:
+                func(*args)
+
+    update_idletasks = update
+
+    # Rendering
+
+    def render(self, mode='RGB') -> Image.Image:
+        """
+            Draw the visible items on a new image.
+        :param mode: PIL mode of the image.
+        """
+        image = Image.new('RGBA', (int(self.width), int(self.height)),
+                          _color(self.background) or (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        for data in self._items.values():
+            if data.options.get('state') != HIDDEN:
+                self._draw_item(image, draw, data)
+        return image if mode == 'RGBA' else image.convert(mode)
+
+    def save(self, path, **kwargs):
+        """
+            Render the canvas and save it to an image file.
+        """
+        self.render().save(path, **kwargs)
+
+    def _draw_item(self, image, draw, data):
+        options = data.options
+        coords = data.coords
+        if data.kind in ('rectangle', 'oval', 'arc'):
+            box = (min(coords[0], coords[2]), min(coords[1], coords[3]),
+                   max(coords[0], coords[2]), max(coords[1], coords[3]))
+            fill, outline = _color(options['fill']), _color(options['outline'])
+            width = int(float(options['width']))
+            if data.kind == 'rectangle':
+                draw.rectangle(box, fill=fill, outline=outline, width=width)
+            elif data.kind == 'oval':
+                draw.ellipse(box, fill=fill, outline=outline, width=width)
+            else:
+                # Tk angles run counterclockwise, PIL ones clockwise.
+                start = -float(options['start']) - float(options['extent'])
+                end = -float(options['start'])
+                style = options['style']
+                if style == 'arc':
+                    draw.arc(box, start, end, fill=outline, width=width)
+                elif style == 'chord':
+                    draw.chord(box, start, end, fill=fill, outline=outline,
+                               width=width)
+                else:
+                    draw.pieslice(box, start, end, fill=fill, outline=outline,
+                                  width=width)
+        elif data.kind == 'line':
+            fill = _color(options['fill'])
+            if fill is not None and len(coords) >= 4:
+                draw.line(coords, fill=fill, width=int(float(options['width'])))
+        elif data.kind == 'text':
+            fill = _color(options['fill'])
+            box = self._item_bbox(data)
+            if fill is not None and box is not None:
+                draw.multiline_text(box[:2], self._wrapped_text(data),
+                                    fill=fill, font=_pil_font(options['font']),
+                                    align=options['justify'])
+        elif data.kind == 'image':
+            source = options['image']
+            box = self._item_bbox(data)
+            if isinstance(source, Image.Image) and box is not None:
+                # alpha_composite only takes destinations inside the image.
+                left, top = max(box[0], 0), max(box[1], 0)
+                source = source.convert('RGBA').crop(
+                    (left - box[0], top - box[1], source.width, source.height))
+                if left < image.width and top < image.height:
+                    image.alpha_composite(source, (left, top))
@@ -0,0 +1,173 @@
+import csv
+import marshal
+import time
+from collections import defaultdict
+from functools import wraps
+
+from .canvaswidgets import CanvasSection, CanvasButton
+
+OPERATIONS = ('create_arc', 'create_image', 'create_line', 'create_oval',
+              'create_rectangle', 'create_text', 'itemconfig', 'itemcget',
+              'bbox', 'coords', 'move', 'scale', 'delete', 'find_withtag',
+              'tag_bind', 'tag_unbind')
+
+_active = []
+_patched = []
+_context = []
+
+
+def _subclasses(cls):
+    yield cls
+    for subclass in cls.__subclasses__():
+        yield from _subclasses(subclass)
+
+
+def _operation_wrapper(name, func):
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if _context and _context[-1] is None:
+            return func(self, *args, **kwargs)
+        widget = _context[-1] if _context else type(self).__name__
+        _context.append(None)
+        start = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _context.pop()
+            key = (name, self.tag[0] if self.tag else '', widget)
+            for profiler in _active:
+                record = profiler.records[key]
+                record[0] += 1
+                record[1] += elapsed
+    return wrapper
+
+
+def _context_wrapper(cls, func):
+    name = cls.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        _context.append(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _context.pop()
+    return wrapper
+
+
+def _patch():
+    for cls in _subclasses(CanvasSection):
+        for name in OPERATIONS:
+            if name in cls.__dict__:
+                _patched.append((cls, name, cls.__dict__[name]))
+                setattr(cls, name, _operation_wrapper(name, cls.__dict__[name]))
+    for name, func in list(CanvasButton.__dict__.items()):
+        if callable(func) and (name == '__init__' or not name.startswith('__')):
+            _patched.append((CanvasButton, name, func))
+            setattr(CanvasButton, name, _context_wrapper(CanvasButton, func))
+
+
+def _unpatch():
+    while _patched:
+        cls, name, func = _patched.pop()
+        setattr(cls, name, func)
+
+
+class Profiler:
+    """
+        Counts the canvas operations made through CanvasSections, and the
+        time spent in them, per operation, section tag and widget class.
+        The section and button classes are only instrumented while a
+        Profiler is enabled, so there is no overhead otherwise.
+    """
+
+    def __init__(self):
+        self.records = defaultdict(lambda: [0, 0.0])
+        self.stats = {}
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    @property
+    def enabled(self):
+        return self in _active
+
+    def enable(self):
+        if self in _active:
+            return
+        if not _active:
+            _patch()
+        _active.append(self)
+
+    def disable(self):
+        if self not in _active:
+            return
+        _active.remove(self)
+        if not _active:
+            _unpatch()
+
+    def reset(self):
+        self.records.clear()
+
+    def _group(self, index):
+        groups = defaultdict(lambda: {'calls': 0, 'time': 0.0})
+        for key, (calls, elapsed) in self.records.items():
+            group = groups[key[index]]
+            group['calls'] += calls
+            group['time'] += elapsed
+        return dict(groups)
+
+    def summary(self):
+        """
+            The collected numbers grouped by operation, tag and widget class.
+        :return: Dictionary of the form
+                 {'operations': {name: {'calls': int, 'time': float}},
+                  'tags': {...}, 'widgets': {...}}.
+        """
+        return {'operations': self._group(0), 'tags': self._group(1),
+                'widgets': self._group(2)}
+
+    @property
+    def total_calls(self):
+        return sum(calls for calls, _ in self.records.values())
+
+    def to_csv(self, file):
+        """
+            Write the records as CSV rows of operation, tag, widget,
+            calls and time.
+        :param file: Path or a writable text file object.
+        """
+        if isinstance(file, str):
+            with open(file, 'w', newline='') as csvfile:
+                return self.to_csv(csvfile)
+        writer = csv.writer(file)
+        writer.writerow(('operation', 'tag', 'widget', 'calls', 'time'))
+        for (operation, tag, widget), (calls, elapsed) in sorted(
+                self.records.items()):
+            writer.writerow((operation, tag, widget, calls, elapsed))
+
+    def create_stats(self):
+        """
+            Build the stats attribute in the format of cProfile,
+            so a Profiler can be passed to pstats.Stats.
+        """
+        self.stats = stats = {}
+        for (operation, tag, widget), (calls, elapsed) in self.records.items():
+            key = (tag or '<canvas>', 0, f'{widget}.{operation}')
+            if key in stats:
+                prev_calls, _, prev_time, _, _ = stats[key]
+                calls, elapsed = calls + prev_calls, elapsed + prev_time
+            stats[key] = (calls, calls, elapsed, elapsed, {})
+
+    def dump_stats(self, path):
+        """
+            Save the records in the cProfile file format, readable by pstats.
+        """
+        self.create_stats()
+        with open(path, 'wb') as file:
+            marshal.dump(self.stats, file)
@@ -0,0 +1,160 @@
+import time
+
+from ._batch import _CanvasBatch, BatchItem
+from ._helpers import _canvas_state
+from .spatialindex import _is_id
+
+
+def _ident(item):
+    if isinstance(item, BatchItem):
+        return item if item.id is None else item.id
+    if isinstance(item, str) and item.isdigit():
+        return int(item)
+    return item
+
+
+def _idents(tagOrId):
+    if isinstance(tagOrId, tuple):
+        return {_ident(item) for item in tagOrId}
+    return {_ident(tagOrId)}
+
+
+class UpdateScheduler:
+    """
+        Queues item configuration changes of a canvas and applies them at
+        most once per frame. Changes of the same option of the same item
+        are merged, only the last value is sent to the canvas.
+    """
+
+    def __init__(self, canvas, max_fps=60):
+        """
+            Constructor for an UpdateScheduler, use attach to make the
+            sections of the canvas use it.
+        :param canvas: The master canvas.
+        :param max_fps: Maximal amount of flushes per second.
+        """
+        self.canvas = canvas
+        self.max_fps = max_fps
+        self.flushes = 0
+        self.merged = 0
+        self._pending = {}
+        self._after_id = None
+        self._last_flush = 0.0
+
+    @classmethod
+    def attach(cls, canvas, max_fps=60):
+        """
+            Create a scheduler for a canvas, or get the one it already has.
+            While attached, CanvasSection.itemconfig (and everything built
+            on it: CanvasButton.change_text, SimpleCanvasCheckbox value,
+            hide and show) is queued instead of applied immediately.
+        :param canvas: The master canvas or a section on it.
+        :param max_fps: Maximal amount of flushes per second.
+        """
+        if hasattr(canvas, 'master_canvas'):
+            canvas = canvas.master_canvas()
+        state = _canvas_state(canvas)
+        if state.scheduler is None:
+            state.scheduler = cls(canvas, max_fps)
+        else:
+            state.scheduler.max_fps = max_fps
+        return state.scheduler
+
+    def detach(self):
+        """
+            Apply the queued changes and stop scheduling the canvas updates.
+        """
+        self.flush()
+        state = _canvas_state(self.canvas)
+        if state.scheduler is self:
+            state.scheduler = None
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def itemconfig(self, item, **kwargs):
+        """
+            Queue a configuration change of an item.
+        :param item: Id or tag of the item.
+        """
+        pending = self._pending
+        for option, value in kwargs.items():
+            key = (item, option)
+            if pending.pop(key, None) is not None:
+                self.merged += 1
+            pending[key] = value
+        if self._after_id is None and pending:
+            delay = self._last_flush + 1 / self.max_fps - time.perf_counter()
+            if delay <= 0:
+                self._after_id = self.canvas.after_idle(self._on_frame)
+            else:
+                self._after_id = self.canvas.after(int(delay * 1000) + 1,
+                                                   self._on_frame)
+
+    itemconfigure = itemconfig
+
+    def cget(self, item, option, default=None):
+        """
+            Get the queued value of an item option.
+        :return: The queued value converted to a string, or default
+                 when no change of the option is queued or a change of the
+                 option queued after it for a tag may override it.
+        """
+        value = self._pending.get((item, option))
+        if value is None:
+            return default
+        # Changes are kept in the order they were last queued.
+        keys = iter(self._pending)
+        for key in keys:
+            if key == (item, option):
+                break
+        for other, other_option in keys:
+            if other_option == option and not _is_id(other):
+                return default
+        return str(value)
+
+    def discard(self, tagOrId):
+        """
+            Drop the queued changes of deleted items, so they are not
+            applied to the items of a section that gets the tag next.
+        :param tagOrId: Id or tag of the deleted items, or a tuple of them.
+        """
+        targets = _idents(tagOrId)
+        for key in [key for key in self._pending
+                    if not targets.isdisjoint(_idents(key[0]))]:
+            del self._pending[key]
+
+    def _on_frame(self):
+        self._after_id = None
+        self.flush()
+
+    def flush(self):
+        """
+            Apply all the queued changes now.
+        """
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+            self._after_id = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self._last_flush = time.perf_counter()
+        self.flushes += 1
+        dest = _canvas_state(self.canvas).batch
+        batch = None
+        if dest is None:
+            if hasattr(self.canvas, 'tk'):
+                dest = batch = _CanvasBatch(self.canvas)
+            else:
+                dest = self.canvas
+        current, options = None, {}
+        for (item, option), value in pending.items():
+            if options and item != current:
+                dest.itemconfig(current, **options)
+                options = {}
+            current = item
+            options[option] = value
+        dest.itemconfig(current, **options)
+        if batch is not None:
+            batch.flush()
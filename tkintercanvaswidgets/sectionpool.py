@@ -0,0 +1,105 @@
+import weakref
+from collections.abc import Callable
+
+from .canvaswidgets import CanvasSection
+from .virtuallist import _PARK_OFFSET, _hide_section, _show_section
+
+
+class SectionPool:
+    """
+        Keeps released sections, hidden and parked outside the visible part
+        of the canvas, to hand them out again instead of drawing new ones.
+        Sections are reused for the same parent, size and key only.
+    """
+
+    def __init__(self, factory: Callable = CanvasSection, limit=None,
+                 reset: Callable = None):
+        """
+            Constructor for a SectionPool
+        :param factory: Called as factory(parent, x, y, width, height,
+                        **kwargs) to build a section when none is free,
+                        CanvasSection or one of its subclasses.
+        :param limit: Maximal amount of free sections kept per shape,
+                      released sections beyond it are destroyed.
+        :param reset: Called as reset(section) when a section is released,
+                      before it is hidden, to bring back the content the
+                      factory drew (texts, checkbox values, ...). Without
+                      it sections are acquired again as they were released.
+        """
+        self.factory = factory
+        self.limit = limit
+        self.reset = reset
+        self._free = {}
+        # States of the items each free section showed before release.
+        self._hidden = {}
+        # Shape and construction time sequences of every acquired section.
+        self._acquired = weakref.WeakKeyDictionary()
+
+    def __len__(self):
+        return sum(len(sections) for sections in self._free.values())
+
+    def acquire(self, parent, x, y, width, height, key=None, **kwargs):
+        """
+            Get a section of the given shape, reused when possible.
+        :param parent: Parent canvas or section of the section.
+        :param x: The x on the parent from which the section starts.
+        :param y: The y on the parent from which the section starts.
+        :param key: Hashable value telling apart sections of the same size
+                    that the factory draws differently.
+        :param kwargs: Extra arguments for the factory, only used when a new
+                       section is built.
+        """
+        shape = (parent, width, height, key)
+        free = self._free.get(shape)
+        if free:
+            section = free.pop()
+            section.relocate(x, y)
+            _show_section(section, self._hidden.pop(section))
+            return section
+        section = self.factory(parent, x, y, width, height, **kwargs)
+        # Handlers bound while building belong to the section itself
+        # and survive release.
+        self._acquired[section] = (shape, {
+            event: len(handlers)
+            for event, handlers in (section._events or {}).items()})
+        return section
+
+    def release(self, section):
+        """
+            Hide and park a section acquired from this pool until it is
+            acquired again. Handlers bound on the section after it was
+            built are unbound, and the reset function of the pool is called.
+            The items are shown again with their states on acquire.
+        """
+        if section not in self._acquired:
+            raise ValueError('The section was not acquired from this pool.')
+        shape, events = self._acquired[section]
+        free = self._free.setdefault(shape, [])
+        if section in free:
+            return
+        for event, handlers in list((section._events or {}).items()):
+            built = events.get(event, 0)
+            for tag, funcid in handlers[built:]:
+                section.tag_unbind(tag, event, funcid)
+            del handlers[built:]
+            if not handlers:
+                del section._events[event]
+        if self.limit is not None and len(free) >= self.limit:
+            del self._acquired[section]
+            section.destroy()
+            return
+        if self.reset is not None:
+            self.reset(section)
+        self._hidden[section] = _hide_section(section)
+        section.relocate(_PARK_OFFSET, _PARK_OFFSET)
+        free.append(section)
+
+    def clear(self):
+        """
+            Destroy all the free sections.
+        """
+        free, self._free = self._free, {}
+        self._hidden.clear()
+        for sections in free.values():
+            for section in sections:
+                section.destroy()
@@ -0,0 +1,319 @@
+from collections import defaultdict
+from math import floor, hypot
+from tkinter import HIDDEN
+
+from ._batch import BatchItem
+
+
+def _is_id(item):
+    return (isinstance(item, (int, BatchItem)) or
+            (isinstance(item, str) and item.isdigit()))
+
+
+class SpatialIndex:
+    """
+        Uniform grid of item bounding boxes, in canvas coordinates,
+        answering region queries without asking the canvas.
+        Items whose size is only known to Tk (text and images) are measured
+        in bulk, with the measure function, before the next query.
+    """
+    # Items spanning more cells than this are kept in a separate list.
+    max_cells = 256
+
+    def __init__(self, measure, cell_size=64):
+        """
+            Constructor for a SpatialIndex
+        :param measure: Function returning a dictionary of item to bbox for
+                        a list of items, used for text and image items.
+        :param cell_size: Size of the grid cells.
+        """
+        self.cell_size = cell_size
+        self._measure = measure
+        self._cells = defaultdict(set)
+        self._large = set()
+        self._boxes = {}
+        self._tags = {}
+        self._hidden = set()
+        self._pending = set()
+        self._unresolved = []
+        # Cells ever used, bounds the ring search of nearest.
+        self._extent = None
+
+    def __len__(self):
+        return len(self._boxes) + len(self._pending)
+
+    def __contains__(self, item):
+        item = self._key(item)
+        return item in self._boxes or item in self._pending
+
+    @staticmethod
+    def _key(item):
+        if isinstance(item, BatchItem):
+            return item if item.id is None else item.id
+        if isinstance(item, str):
+            return int(item)
+        return item
+
+    def _cell_range(self, box):
+        size = self.cell_size
+        return (floor(box[0] / size), floor(box[1] / size),
+                floor(box[2] / size), floor(box[3] / size))
+
+    def _place(self, item, box):
+        self._boxes[item] = box
+        x0, y0, x1, y1 = self._cell_range(box)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > self.max_cells:
+            self._large.add(item)
+            return
+        extent = self._extent
+        if extent is None:
+            self._extent = [x0, y0, x1, y1]
+        else:
+            extent[0], extent[1] = min(extent[0], x0), min(extent[1], y0)
+            extent[2], extent[3] = max(extent[2], x1), max(extent[3], y1)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self._cells[cx, cy].add(item)
+
+    def _unplace(self, item):
+        box = self._boxes.pop(item, None)
+        if box is None:
+            return
+        if item in self._large:
+            self._large.discard(item)
+            return
+        x0, y0, x1, y1 = self._cell_range(box)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell is not None:
+                    cell.discard(item)
+                    if not cell:
+                        del self._cells[cx, cy]
+
+    def _matching(self, tagOrId):
+        if self._unresolved:
+            self._rekey()
+        if _is_id(tagOrId):
+            item = self._key(tagOrId)
+            return [item] if item in self._tags else []
+        tags = set(tagOrId) if isinstance(tagOrId, tuple) else {tagOrId}
+        if 'all' in tags:
+            return list(self._tags)
+        return [item for item, item_tags in self._tags.items()
+                if tags <= item_tags]
+
+    def add(self, item, box=None, tags=(), hidden=False):
+        """
+            Add an item.
+        :param item: Id of the item.
+        :param box: Bounding box (x1, y1, x2, y2) of the item,
+                    None to measure it before the next query.
+        :param tags: Tags of the item.
+        :param hidden: The item is created with the hidden state.
+        """
+        item = self._key(item)
+        if isinstance(item, BatchItem):
+            self._unresolved.append(item)
+        self._tags[item] = frozenset(tags)
+        if hidden:
+            self._hidden.add(item)
+        self.update(item, box)
+
+    def update(self, item, box=None):
+        """
+            Replace the bounding box of an item, None to measure it again.
+            Given a tag, the matching items are measured again, the canvas
+            only changes the coords of the first of them.
+        """
+        if not _is_id(item):
+            for match in self._matching(item):
+                self.update(match, None)
+            return
+        item = self._key(item)
+        if self._unresolved and not isinstance(item, BatchItem):
+            self._rekey()
+        self._unplace(item)
+        if box is None:
+            self._pending.add(item)
+        else:
+            self._pending.discard(item)
+            self._place(item, (min(box[0], box[2]), min(box[1], box[3]),
+                               max(box[0], box[2]), max(box[1], box[3])))
+
+    def move(self, tagOrId, x, y):
+        for item in self._matching(tagOrId):
+            box = self._boxes.get(item)
+            if box is not None:
+                self._unplace(item)
+                self._place(item, (box[0] + x, box[1] + y,
+                                   box[2] + x, box[3] + y))
+
+    def invalidate(self, tagOrId):
+        """
+            Measure the matching items again before the next query.
+        """
+        for item in self._matching(tagOrId):
+            if item not in self._pending:
+                self.update(item, None)
+
+    def remove(self, tagOrId):
+        for item in self._matching(tagOrId):
+            self._unplace(item)
+            self._pending.discard(item)
+            self._hidden.discard(item)
+            del self._tags[item]
+
+    def configure(self, tagOrId, options):
+        """
+            Follow item configuration changes that affect the index.
+        :param options: The changed options.
+        """
+        items = self._matching(tagOrId)
+        if 'state' in options:
+            if options['state'] == HIDDEN:
+                self._hidden.update(items)
+            else:
+                self._hidden.difference_update(items)
+                # Hidden items have no bbox, measure them now they show.
+                for item in items:
+                    if item not in self._boxes:
+                        self.update(item, None)
+        if any(option in options for option in
+               ('text', 'font', 'image', 'width', 'anchor', 'justify')):
+            for item in items:
+                if item not in self._pending:
+                    self.update(item, None)
+
+    def _rekey(self, flush=False):
+        """
+            Key the items created in a batch by their canvas id.
+        :param flush: Flush the batches of items that are still pending.
+        """
+        unresolved, self._unresolved = self._unresolved, []
+        for item in unresolved:
+            if item not in self._tags:
+                continue
+            if item.id is None and not flush:
+                self._unresolved.append(item)
+                continue
+            key = int(item)
+            self._tags[key] = self._tags.pop(item)
+            if item in self._hidden:
+                self._hidden.discard(item)
+                self._hidden.add(key)
+            if item in self._pending:
+                self._pending.discard(item)
+                self._pending.add(key)
+            else:
+                box = self._boxes.get(item)
+                self._unplace(item)
+                self._place(key, box)
+
+    def _refresh(self):
+        if self._unresolved:
+            self._rekey(flush=True)
+        # Hidden items have no bbox, they stay pending until shown.
+        pending = self._pending - self._hidden
+        if pending:
+            for item, box in self._measure(list(pending)).items():
+                if box:
+                    self._pending.discard(item)
+                    self._place(item, tuple(box))
+
+    def _candidates(self, x0, y0, x1, y1, tag=None):
+        self._refresh()
+        found = set(self._large)
+        cx0, cy0, cx1, cy1 = self._cell_range((x0, y0, x1, y1))
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self._cells):
+            for cell in self._cells.values():
+                found.update(cell)
+        else:
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    cell = self._cells.get((cx, cy))
+                    if cell:
+                        found.update(cell)
+        found.difference_update(self._hidden)
+        if tag is not None:
+            tags = self._tags
+            return [item for item in found if tag in tags[item]]
+        return found
+
+    def items_in_rect(self, x0, y0, x1, y1, enclosed=False, tag=None):
+        """
+            Get the items overlapping (or enclosed in) a rectangle.
+        :param enclosed: Only return the items entirely inside the rectangle.
+        :param tag: Only return the items with this tag.
+        """
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        boxes = self._boxes
+        if enclosed:
+            return [item for item in self._candidates(x0, y0, x1, y1, tag)
+                    if x0 <= boxes[item][0] and boxes[item][2] <= x1 and
+                    y0 <= boxes[item][1] and boxes[item][3] <= y1]
+        return [item for item in self._candidates(x0, y0, x1, y1, tag)
+                if boxes[item][0] <= x1 and x0 <= boxes[item][2] and
+                boxes[item][1] <= y1 and y0 <= boxes[item][3]]
+
+    def items_at_point(self, x, y, tag=None):
+        return self.items_in_rect(x, y, x, y, tag=tag)
+
+    def _distance(self, item, x, y):
+        box = self._boxes[item]
+        dx = max(box[0] - x, 0, x - box[2])
+        dy = max(box[1] - y, 0, y - box[3])
+        return hypot(dx, dy)
+
+    def nearest(self, x, y, max_distance=None, tag=None):
+        """
+            Get the item closest to a point.
+        :param max_distance: Ignore items further away than this.
+        :param tag: Only consider the items with this tag.
+        :return: The item id, None if there is no such item.
+        """
+        self._refresh()
+        tags = self._tags
+        best, best_distance = None, max_distance
+        for item in self._large - self._hidden:
+            if tag is not None and tag not in tags[item]:
+                continue
+            distance = self._distance(item, x, y)
+            if best_distance is None or distance <= best_distance:
+                best, best_distance = item, distance
+        size = self.cell_size
+        cx, cy = floor(x / size), floor(y / size)
+        extent = self._extent
+        if extent is not None:
+            max_ring = max(abs(cx - extent[0]), abs(cx - extent[2]),
+                           abs(cy - extent[1]), abs(cy - extent[3]))
+        else:
+            max_ring = -1
+        ring = 0
+        while ring <= max_ring:
+            # Items in this ring are at least (ring - 1) cells away.
+            if best_distance is not None and best_distance < (ring - 1) * size:
+                break
+            for key in self._ring(cx, cy, ring):
+                for item in self._cells.get(key, ()):
+                    if item in self._hidden or (tag is not None and
+                                                tag not in tags[item]):
+                        continue
+                    distance = self._distance(item, x, y)
+                    if best_distance is None or distance < best_distance:
+                        best, best_distance = item, distance
+            ring += 1
+        return best
+
+    @staticmethod
+    def _ring(cx, cy, ring):
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
@@ -0,0 +1,246 @@
+from collections.abc import Callable
+
+from .canvaswidgets import (CanvasSection, CanvasButton, SimpleCanvasCheckbox,
+                           _CHECKBOX_COLORS)
+from ._helpers import _fit_text_width, _shared_style, font_registry
+
+
+class Param:
+    """
+        Placeholder for a value given when a LayoutTemplate is stamped.
+    """
+    __slots__ = ('name', 'default')
+
+    def __init__(self, name, default=None):
+        """
+        :param name: Keyword of the value in LayoutTemplate.stamp.
+        :param default: Value used when stamp does not get one.
+        """
+        self.name = name
+        self.default = default
+
+    def __repr__(self):
+        return f'Param({self.name!r})'
+
+
+def _param_paths(kwargs):
+    """
+        Find the Params of keyword arguments, one level of dicts deep.
+    :return: List of (key, inner key or None) pairs.
+    """
+    paths = []
+    for key, value in kwargs.items():
+        if isinstance(value, Param):
+            paths.append((key, None))
+        elif isinstance(value, dict):
+            paths.extend((key, inner) for inner, item in value.items()
+                         if isinstance(item, Param))
+    return paths
+
+
+def _substitute(kwargs, paths, params):
+    if not paths:
+        return kwargs
+    kwargs = dict(kwargs)
+    for key, inner in paths:
+        if inner is None:
+            param = kwargs[key]
+            kwargs[key] = params.get(param.name, param.default)
+        else:
+            if kwargs[key] is not None:
+                kwargs[key] = dict(kwargs[key])
+            param = kwargs[key][inner]
+            kwargs[key][inner] = params.get(param.name, param.default)
+    return kwargs
+
+
+class LayoutInstance:
+    """
+        A stamped LayoutTemplate: its section and the items and widgets
+        created in it, by handle (or name) of the recording call.
+    """
+    __slots__ = ('section', 'items', '_names')
+
+    def __init__(self, section, items, names):
+        self.section = section
+        self.items = items
+        self._names = names
+
+    def __getitem__(self, handle):
+        if isinstance(handle, str):
+            handle = self._names[handle]
+        return self.items[handle]
+
+
+class LayoutTemplate:
+    """
+        The construction of a section recorded once and stamped out many
+        times. Items are stored with their offsets in the section, their
+        own tags and their fitted text, so stamping only creates them.
+        Values that change per instance are given as Param objects.
+    """
+    # Maximal amount of fitted texts kept, the cache is cleared when full.
+    max_fitted = 4096
+
+    def __init__(self, width, height, section_factory: Callable = CanvasSection):
+        """
+            Constructor for a LayoutTemplate
+        :param width: The width of the stamped sections.
+        :param height: The height of the stamped sections.
+        :param section_factory: Called as section_factory(parent, x, y,
+                                width, height) to build the stamped sections.
+        """
+        self.width = width
+        self.height = height
+        self.section_factory = section_factory
+        self._ops = []
+        self._names = {}
+        self._fitted = {}
+        self._fonts = []
+
+    def __len__(self):
+        return len(self._ops)
+
+    def _record(self, op, name):
+        handle = len(self._ops)
+        self._ops.append(op)
+        if name is not None:
+            self._names[name] = handle
+        return handle
+
+    def _item(self, item_type, coords, kwargs, name, fit=None):
+        tags = kwargs.pop('tags', None)
+        if isinstance(tags, str):
+            tags = (tags, )
+        return self._record(('item', item_type, tuple(coords), kwargs,
+                             _param_paths(kwargs), tuple(tags or ()), fit),
+                            name)
+
+    def create_rectangle(self, left, top, right, bottom, name=None, **kwargs):
+        return self._item('rectangle', (left, top, right, bottom), kwargs, name)
+
+    def create_oval(self, x, y, xsize, ysize, name=None, **kwargs):
+        return self._item('oval', (x, y, xsize, ysize), kwargs, name)
+
+    def create_arc(self, x, y, xsize, ysize, name=None, **kwargs):
+        return self._item('arc', (x, y, xsize, ysize), kwargs, name)
+
+    def create_line(self, *args, name=None, **kwargs):
+        return self._item('line', args, kwargs, name)
+
+    def create_image(self, x, y, name=None, **kwargs):
+        return self._item('image', (x, y), kwargs, name)
+
+    def create_text(self, x, y, name=None, fit_width=None, max_lines=None,
+                    divider=None, **kwargs):
+        """
+            Record a text item.
+        :param fit_width: Break the text in lines of this width with
+                          _fit_text_width, the font option is required.
+                          The result is kept per text value.
+        :param max_lines: Maximal number of lines of the fitted text.
+        :param divider: Character to break the lines on.
+        :return: Handle of the item in the stamped LayoutInstances.
+        """
+        fit = None
+        if fit_width is not None:
+            fit = (fit_width, divider, max_lines)
+            text = kwargs.get('text')
+            if isinstance(text, str):
+                kwargs['text'] = _fit_text_width(kwargs['font'], text,
+                                                 fit_width, divider, max_lines)
+                fit = None
+        return self._item('text', (x, y), kwargs, name, fit)
+
+    def create_button(self, x, y, name=None, **kwargs):
+        """
+            Record a CanvasButton, any of its arguments (and the values of
+            the image and text dictionaries) can be a Param.
+        :return: Handle of the button in the stamped LayoutInstances.
+        """
+        return self._record(('button', (x, y), kwargs, _param_paths(kwargs)),
+                            name)
+
+    def create_checkbox(self, x, y, width, height, name=None, font=None,
+                        colors=None, **kwargs):
+        """
+            Record a SimpleCanvasCheckbox. Its font and colors are resolved
+            now and shared by all the stamped checkboxes, the template holds
+            the font until close.
+        :return: Handle of the checkbox in the stamped LayoutInstances.
+        """
+        if font is None:
+            font = font_registry.acquire(height)
+        else:
+            font = font_registry.acquire_like(font, height)
+        self._fonts.append(font)
+        kwargs['font'] = font
+        kwargs['colors'] = _shared_style(_CHECKBOX_COLORS, colors)
+        return self._record(('checkbox', (x, y, width, height), kwargs,
+                             _param_paths(kwargs)), name)
+
+    def _fit(self, handle, font, text, fit):
+        # str gives the name of Font objects, which are not hashable.
+        key = (handle, str(font), text)
+        fitted = self._fitted.get(key)
+        if fitted is None:
+            if len(self._fitted) >= self.max_fitted:
+                self._fitted.clear()
+            fitted = self._fitted[key] = _fit_text_width(font, text, fit[0],
+                                                         fit[1], fit[2])
+        return fitted
+
+    def close(self):
+        """
+            Release the fonts of the recorded checkboxes, stamped
+            checkboxes keep theirs until they are destroyed. The template
+            can not stamp checkboxes afterwards.
+        """
+        for font in self._fonts:
+            font_registry.release(font)
+        self._fonts.clear()
+        self._fitted.clear()
+
+    def stamp(self, parent, x, y, tag=None, **params) -> LayoutInstance:
+        """
+            Build a new instance of the template.
+        :param parent: Parent canvas or section of the new section.
+        :param x: The x on the parent from which the section starts.
+        :param y: The y on the parent from which the section starts.
+        :param tag: Tag for the new section.
+        :param params: Values of the Params of the template.
+        """
+        section = self.section_factory(parent, x, y, self.width, self.height,
+                                       tag=tag)
+        absx, absy = section._absx, section._absy
+        section_tags = section._item_tags
+        items = []
+        with section.batch() as dest:
+            for handle, op in enumerate(self._ops):
+                kind = op[0]
+                if kind == 'item':
+                    _, item_type, coords, kwargs, paths, tags, fit = op
+                    kwargs = _substitute(kwargs, paths, params)
+                    if fit is not None:
+                        kwargs['text'] = self._fit(handle, kwargs['font'],
+                                                   kwargs['text'], fit)
+                    kwargs['tags'] = ((*tags, *section_tags) if tags
+                                      else section_tags)
+                    coords = [val + (absy if index % 2 else absx)
+                              for index, val in enumerate(coords)]
+                    item = getattr(dest, f'create_{item_type}')(*coords,
+                                                                **kwargs)
+                    if section._index is not None:
+                        section._indexed(item, kwargs,
+                                         None if len(coords) == 2 else coords)
+                    items.append(item)
+                elif kind == 'button':
+                    _, (bx, by), kwargs, paths = op
+                    items.append(CanvasButton(section, bx, by, **_substitute(
+                        kwargs, paths, params)))
+                else:
+                    _, (cx, cy, width, height), kwargs, paths = op
+                    items.append(SimpleCanvasCheckbox(
+                        section, cx, cy, width, height,
+                        **_substitute(kwargs, paths, params)))
+        return LayoutInstance(section, items, self._names)
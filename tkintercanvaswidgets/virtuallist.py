@@ -0,0 +1,266 @@
+from math import ceil
+from collections.abc import Callable, Sequence
+
+from tkinter import HIDDEN
+
+from .canvaswidgets import CanvasSection, _item_states
+
+# Offset used to park rows that are built but not visible,
+# far away from the visible part of the canvas.
+_PARK_OFFSET = -10 ** 6
+
+
+def _hide_section(section):
+    """
+        Hide the shown items of a parked section, so they are left out of
+        canvas.bbox('all') (and the scroll region built from it).
+    :return: The states of the items that were shown, for _show_section.
+    """
+    tag = section.tag[0]
+    states = {item: state for item, state in
+              _item_states(section.master_canvas(), tag).items()
+              if state != HIDDEN}
+    if states:
+        section.itemconfig(tag, state=HIDDEN)
+    return states
+
+
+def _show_section(section, states):
+    """
+        Give back the items hidden by _hide_section their states.
+    """
+    with section.batch():
+        for item, state in states.items():
+            section.itemconfig(item, state=state)
+
+
+class _Cell:
+    __slots__ = ('section', 'row', 'index', 'hidden')
+
+    def __init__(self, section, row):
+        self.section = section
+        self.row = row
+        self.index = None
+        # States of the shown items while the cell is parked.
+        self.hidden = None
+
+
+class VirtualList(CanvasSection):
+    def __init__(self, parent, x, y, width, height, cell_height,
+                 data: Sequence, row_factory: Callable, row_update: Callable,
+                 columns=1, overscan=2, tag=None, yscrollcommand=None):
+        """
+            Scrollable list (or grid when columns > 1) that only draws the
+            visible cells. Cells are CanvasSections that are recycled while
+            scrolling, so the amount of canvas items does not depend on the
+            length of the data.
+        :param parent: Parent canvas or section that will be used.
+        :param x: The initial x on the parent from which the list starts.
+        :param y: The initial y on the parent from which the list starts.
+        :param width: The width of the list.
+        :param height: The height of the visible part of the list.
+        :param cell_height: The height of every cell.
+        :param data: Data source, any object with __len__ and __getitem__.
+        :param row_factory: Called as row_factory(section) to draw a new cell
+                            in the given section, returns an object holding
+                            the cell widgets.
+        :param row_update: Called as row_update(row, index, item) to show
+                           the data item at index in a (possibly recycled)
+                           cell.
+        :param columns: Number of cells in each line.
+        :param overscan: Lines kept prepared above and below the visible
+                         region.
+        :param tag: Tag for the elements in this section.
+        :param yscrollcommand: Called with the first and last visible
+                               fractions after scrolling, like the
+                               yscrollcommand of Tk widgets.
+        """
+        super().__init__(parent, x, y, width, height, tag=tag)
+        self.cell_height = cell_height
+        self.columns = columns
+        self.overscan = overscan
+        self.yscrollcommand = yscrollcommand
+        self._data = data
+        self._row_factory = row_factory
+        self._row_update = row_update
+        self._offset = 0
+        self._cells = {}
+        self._free = []
+        self.refresh()
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, data: Sequence):
+        self._data = data
+        self.invalidate()
+
+    @property
+    def cell_width(self):
+        return self.width / self.columns
+
+    @property
+    def content_height(self):
+        return ceil(len(self._data) / self.columns) * self.cell_height
+
+    def _max_offset(self):
+        return max(self.content_height - self.height, 0)
+
+    def _visible_lines(self):
+        first = int(self._offset // self.cell_height)
+        last = ceil((self._offset + self.height) / self.cell_height)
+        return first, last
+
+    def _cell_position(self, index):
+        line, column = divmod(index, self.columns)
+        return column * self.cell_width, line * self.cell_height - self._offset
+
+    def _new_cell(self):
+        section = CanvasSection(self, 0, _PARK_OFFSET, self.cell_width,
+                                self.cell_height)
+        return _Cell(section, self._row_factory(section))
+
+    @staticmethod
+    def _place(cell, x, y):
+        section = cell.section
+        if section._initx != x or section._inity != y:
+            section.relocate(x, y)
+        if cell.hidden is not None:
+            _show_section(section, cell.hidden)
+            cell.hidden = None
+
+    @staticmethod
+    def _park(cell):
+        if cell.hidden is None:
+            cell.hidden = _hide_section(cell.section)
+        section = cell.section
+        if section._initx != 0 or section._inity != _PARK_OFFSET:
+            section.relocate(0, _PARK_OFFSET)
+
+    def _update(self, cell, index, repark=True):
+        """
+            Show the data item at index in a cell, the items of a parked
+            cell are shown while row_update changes them.
+        :param repark: Hide the items of a parked cell again afterwards.
+        """
+        parked = cell.hidden is not None
+        if parked:
+            _show_section(cell.section, cell.hidden)
+            cell.hidden = None
+        self._row_update(cell.row, index, self._data[index])
+        if parked and repark:
+            cell.hidden = _hide_section(cell.section)
+
+    def _scaled(self, factor):
+        self.cell_height *= factor
+        self._offset *= factor
+
+    def refresh(self):
+        """
+            Bind the cells of the visible region (and the overscan margin)
+            to their data items and place them.
+        """
+        count = len(self._data)
+        first, last = self._visible_lines()
+        shown = range(first * self.columns, min(last * self.columns, count))
+        first = max(first - self.overscan, 0) * self.columns
+        last = min((last + self.overscan) * self.columns, count)
+
+        with self.batch():
+            for index in [index for index in self._cells
+                          if not first <= index < last]:
+                cell = self._cells.pop(index)
+                cell.index = None
+                self._park(cell)
+                self._free.append(cell)
+            for index in range(first, last):
+                cell = self._cells.get(index)
+                if cell is None:
+                    cell = self._free.pop() if self._free else self._new_cell()
+                    cell.index = index
+                    self._update(cell, index, repark=False)
+                    self._cells[index] = cell
+                if index in shown:
+                    self._place(cell, *self._cell_position(index))
+                else:
+                    self._park(cell)
+        if self.yscrollcommand is not None:
+            self.yscrollcommand(*self.yview())
+
+    def invalidate(self, index=None):
+        """
+            Show changes of the data source.
+        :param index: Index of the changed item, all cells are updated
+                      when None.
+        """
+        if index is None:
+            for cell in self._cells.values():
+                self._free.append(cell)
+                self._park(cell)
+            self._cells.clear()
+            self._offset = min(self._offset, self._max_offset())
+        else:
+            cell = self._cells.get(index)
+            if cell is not None:
+                self._update(cell, index)
+            return
+        self.refresh()
+
+    def row(self, index):
+        """
+            Get the row object of a data index, None if it is not drawn.
+        """
+        cell = self._cells.get(index)
+        return cell.row if cell is not None else None
+
+    def scroll_to(self, offset):
+        """
+            Scroll to a pixel offset from the top of the content.
+        """
+        offset = min(max(offset, 0), self._max_offset())
+        if offset != self._offset:
+            self._offset = offset
+            self.refresh()
+
+    def scroll(self, delta):
+        """
+            Scroll by a pixel delta.
+        """
+        self.scroll_to(self._offset + delta)
+
+    def see(self, index):
+        """
+            Scroll the minimal amount needed to show the item at index.
+        """
+        top = (index // self.columns) * self.cell_height
+        if top < self._offset:
+            self.scroll_to(top)
+        elif top + self.cell_height > self._offset + self.height:
+            self.scroll_to(top + self.cell_height - self.height)
+
+    def yview(self, *args):
+        """
+            Query or change the vertical position, the same way as the yview
+            of Tk widgets, so the list can be the command of a Scrollbar.
+        """
+        if not args:
+            total = self.content_height
+            if total == 0:
+                return 0.0, 1.0
+            return (self._offset / total,
+                    min((self._offset + self.height) / total, 1.0))
+        if args[0] == 'moveto':
+            self.scroll_to(float(args[1]) * self.content_height)
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                self.scroll(amount * self.height)
+            else:
+                self.scroll(amount * self.cell_height)
+
+    def destroy(self):
+        for cell in (*self._cells.values(), *self._free):
+            cell.section.destroy()
+        super().destroy()